@@ -0,0 +1,639 @@
+#!/usr/bin/env python3
+"""
+转换器基准测试
+
+    python bench.py micro [文件.md ...]   单篇文章各转换步骤的耗时（微基准），与按模式字符串调用 re 的基线对比
+    python bench.py run [选项]            生成合成文档树并完整运行 convert.py 流水线
+    python bench.py run --in-memory       同一语料改用 SiteBuilder 在内存中构建（--no-search 不生成搜索索引）
+    python bench.py startup [--target MS] 启动耗时：导入耗时（-X importtime）与单篇文章构建的端到端时间
+    python bench.py memory [--articles N] 文章记录的内存占用：旧的 dict 与 convert.Article（__slots__）对比
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import timeit
+import tempfile
+import tracemalloc
+import statistics
+import subprocess
+import argparse
+import contextlib
+from pathlib import Path
+from datetime import date
+from operator import attrgetter
+from types import SimpleNamespace
+
+import convert
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块，不统计峰值内存
+    resource = None
+
+# 未指定文件时使用的示例文章（标题、公式、代码、表格、列表、引用各一）
+SAMPLE_ARTICLE = """# 线性回归
+
+线性回归是最基础的**机器学习**模型，目标是最小化 *均方误差*，参见 [教程](https://example.com)。
+
+## 模型
+
+$$
+\\hat{y} = w^T x + b
+$$
+
+行内公式 $y = wx$ 以及 `inline code` 示例。
+
+```python
+import numpy as np
+
+def fit(X, y):
+    return np.linalg.lstsq(X, y)[0]
+```
+
+| 名称 | 含义 |
+|:---|---:|
+| w | 权重 |
+| b | 偏置 |
+
+- 第一项
+- 第二项 ~~删除~~
+
+1. 有序一
+2. 有序二
+
+> 引用一行
+> 引用二行
+
+---
+
+![示意图](fig.png)
+"""
+
+
+def time_per_call(func, number, repeat=5):
+    """返回单次调用的最短耗时（秒）"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+class StringPattern:
+    """基线：把编译后的正则还原为模式字符串，按预编译之前的写法调用 re.sub / re.match 等模块函数
+
+    每次调用都要经过 re 模块的模式缓存查找，与预编译对象的直接调用对比。
+    """
+
+    __slots__ = ('pattern', 'flags')
+
+    def __init__(self, compiled):
+        self.pattern, self.flags = compiled.pattern, compiled.flags
+
+    def sub(self, repl, string, count=0):
+        return re.sub(self.pattern, repl, string, count=count, flags=self.flags)
+
+    def match(self, string):
+        return re.match(self.pattern, string, self.flags)
+
+    def search(self, string):
+        return re.search(self.pattern, string, self.flags)
+
+    def findall(self, string):
+        return re.findall(self.pattern, string, self.flags)
+
+    def finditer(self, string):
+        return re.finditer(self.pattern, string, self.flags)
+
+
+def as_string_patterns(value):
+    """把编译后的正则（以及其中的元组、命名空间）替换为 StringPattern"""
+    if isinstance(value, re.Pattern):
+        return StringPattern(value)
+    if isinstance(value, tuple):
+        return tuple(as_string_patterns(item) for item in value)
+    if isinstance(value, SimpleNamespace):
+        return SimpleNamespace(**{name: as_string_patterns(item) for name, item in vars(value).items()})
+    return value
+
+
+@contextlib.contextmanager
+def string_patterns():
+    """临时把 convert 的预编译正则换成模式字符串（预编译之前的调用方式），退出时恢复"""
+    replaced = {name: value for name, value in vars(convert).items() if isinstance(value, re.Pattern)}
+    regex_patterns = as_string_patterns(convert.regex_engine_patterns())
+    token_patterns = as_string_patterns(convert.token_engine_patterns())
+    replaced['regex_engine_patterns'] = lambda: regex_patterns
+    replaced['token_engine_patterns'] = lambda: token_patterns
+    saved = {name: getattr(convert, name) for name in replaced}
+    for name, value in replaced.items():
+        setattr(convert, name, as_string_patterns(value))
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(convert, name, value)
+
+
+def bench_micro(args):
+    """逐步骤测量单篇文章的转换耗时：预编译正则与按模式字符串调用 re 模块函数（基线）对比"""
+    if args.files:
+        sources = [Path(name).read_text(encoding='utf-8') for name in args.files]
+    else:
+        sources = [SAMPLE_ARTICLE]
+
+    def each(func):
+        return lambda: [func(source) for source in sources]
+
+    steps = [
+        ('extract_title', each(convert.extract_title)),
+        ('extract_excerpt', each(convert.extract_excerpt)),
+        ('get_date_from_filename', lambda: [convert.get_date_from_filename('2026-03-10-linear-regression.md') for _ in sources]),
+        ('analyze_article', each(lambda source: convert.analyze_article(source, '2026-03-10-linear-regression.md'))),
+    ]
+    for engine in sorted(convert.MARKDOWN_ENGINES):
+        steps.append((f'convert[{engine}]', each(lambda source, engine=engine: convert.convert_markdown_to_html(source, engine))))
+
+    total_chars = sum(len(source) for source in sources)
+    print(f"文章数: {len(sources)}，平均长度: {total_chars // len(sources)} 字符，每项重复 {args.number} 次")
+    print(f"{'步骤':<28}{'预编译 (µs)':>14}{'字符串模式 (µs)':>18}{'加速':>10}")
+    for name, func in steps:
+        compiled = time_per_call(func, args.number) / len(sources)
+        with string_patterns():
+            baseline = time_per_call(func, args.number) / len(sources)
+        print(f"{name:<28}{compiled * 1e6:>14.1f}{baseline * 1e6:>18.1f}{baseline / compiled:>9.2f}x")
+
+
+# ============================================================
+# 合成文档树
+# ============================================================
+
+# 正文词表：中英文混排，接近真实笔记
+WORDS = (
+    "模型 训练 损失 梯度 优化 推荐 召回 排序 特征 向量 注意力 样本 数据 评估 实验 "
+    "model loss gradient embedding attention transformer ranking recall feature batch"
+).split()
+
+
+def make_paragraph(rng, words=40):
+    text = ' '.join(rng.choice(WORDS) for _ in range(words))
+    return f"{text}，其中 **{rng.choice(WORDS)}** 与 *{rng.choice(WORDS)}* 是关键，参见 [链接](https://example.com)。"
+
+
+def make_block(rng, args):
+    """按密度参数随机生成一个块：代码、表格、公式、列表或段落"""
+    roll = rng.random()
+    if roll < args.code:
+        lines = '\n'.join(f"    x{i} = {rng.choice(WORDS)}_{i}({i})" for i in range(rng.randint(4, 16)))
+        return f"```python\ndef f():\n{lines}\n```"
+    roll -= args.code
+    if roll < args.tables:
+        rows = '\n'.join(f"| {rng.choice(WORDS)} | {rng.random():.3f} | {rng.randint(1, 99)} |" for _ in range(rng.randint(3, 10)))
+        return f"| 名称 | 数值 | 排名 |\n|:---|---:|:---:|\n{rows}"
+    roll -= args.tables
+    if roll < args.math:
+        return "$$\n\\mathcal{L} = -\\sum_{i} y_i \\log \\hat{y}_i + \\lambda \\|w\\|_2^2\n$$"
+    roll -= args.math
+    if roll < args.lists:
+        return '\n'.join(f"- {rng.choice(WORDS)} {rng.choice(WORDS)} `{rng.choice(WORDS)}`" for _ in range(rng.randint(3, 8)))
+    return make_paragraph(rng)
+
+
+def make_article(rng, title, args):
+    blocks = [f"# {title}"]
+    size = len(blocks[0])
+    while size < args.size:
+        block = make_block(rng, args)
+        blocks.append(block)
+        size += len(block)
+    return '\n\n'.join(blocks) + '\n'
+
+
+def generate_corpus(root, args):
+    """在 root 下生成合成文档树，返回文章总数"""
+    rng = random.Random(args.seed)
+    root = Path(root)
+    nav_menu = [{"name": "首页", "href": "index.html", "is_home": True}]
+    total = 0
+    newest = date(2026, 1, 1).toordinal()
+    for c in range(args.categories):
+        category = f"cat-{c:02d}"
+        nav_menu.append({"name": f"分类 {c}", "href": category})
+        category_dir = root / category
+        category_dir.mkdir(parents=True, exist_ok=True)
+        for a in range(args.articles):
+            day = date.fromordinal(newest - a).isoformat()
+            text = make_article(rng, f"文章 {c}-{a} {rng.choice(WORDS)}", args)
+            (category_dir / f"{day}-post-{a:05d}.md").write_text(text, encoding='utf-8')
+            total += 1
+        for i in range(args.assets):
+            (category_dir / f"figure-{i}.png").write_bytes(rng.randbytes(args.asset_size))
+    config = {"site": {"title": "Bench"}, "nav_menu": nav_menu}
+    (root / "_config.yaml").write_text(json.dumps(config, ensure_ascii=False), encoding='utf-8')
+    return total
+
+
+# ============================================================
+# 完整流水线基准
+# ============================================================
+
+def peak_rss_mb():
+    """当前进程（及已结束子进程）的峰值 RSS（MB）"""
+    if resource is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024  # macOS 单位为字节，Linux 为 KB
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) / scale, 1)
+
+
+def run_pipeline(corpus_dir, jobs, engine, io_workers=0, queue_depth=16):
+    """在 corpus_dir 中全量运行 convert.main()，返回墙钟时间（秒）"""
+    cwd = os.getcwd()
+    os.chdir(corpus_dir)
+    try:
+        argv = ['--force', '--jobs', str(jobs), '--io-workers', str(io_workers), '--queue-depth', str(queue_depth)]
+        if engine:
+            argv += ['--engine', engine]
+        with open(os.devnull, 'w', encoding='utf-8') as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            convert.main(argv)
+            return time.perf_counter() - start
+    finally:
+        os.chdir(cwd)
+
+
+def run_in_memory(corpus_dir, engine, search=None):
+    """用 convert.SiteBuilder 在内存中构建 corpus_dir（读取语料不计时），返回 (墙钟时间, 结果文件数)
+
+    search=False 时不生成全文搜索索引（见 SiteBuilder）。
+    """
+    corpus_dir = Path(corpus_dir)
+    config = json.loads((corpus_dir / "_config.yaml").read_text(encoding='utf-8'))
+    if engine:
+        config['markdown'] = {'engine': engine}
+    sources = {}
+    for path in sorted(corpus_dir.glob('*/*')):
+        if path.is_file() and path.parent.name != convert.OUTPUT_DIR:
+            key = f"{path.parent.name}/{path.name}"
+            sources[key] = path.read_text(encoding='utf-8') if path.suffix == '.md' else path.read_bytes()
+    builder = convert.SiteBuilder(config, sources, search=search)
+    start = time.perf_counter()
+    pages = builder.build()
+    return time.perf_counter() - start, len(pages)
+
+
+def bench_search(search_dir, queries, seed):
+    """统计搜索索引大小，并以冷加载方式（每次查询重新读取分片）测量查询延迟"""
+    search_dir = Path(search_dir)
+    if not (search_dir / "docs.json").exists():
+        return None
+    files = list(search_dir.glob('*.json'))
+    rng = random.Random(seed)
+    latencies = []
+    for _ in range(queries):
+        query = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 2)))
+        start = time.perf_counter()
+        convert.query_search_index(search_dir, query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        'index_kb': round(sum(f.stat().st_size for f in files) / 1024, 1),
+        'docs_kb': round((search_dir / "docs.json").stat().st_size / 1024, 1),
+        'shards': len(files) - 1,
+        'queries': queries,
+        'query_ms_p50': round(latencies[len(latencies) // 2], 3) if latencies else None,
+        'query_ms_max': round(latencies[-1], 3) if latencies else None,
+    }
+
+
+def bench_run(args):
+    """生成合成文档树并测量完整构建"""
+    workdir = Path(args.corpus) if args.corpus else Path(tempfile.mkdtemp(prefix='convert-bench-'))
+    try:
+        if args.corpus and (workdir / "_config.yaml").exists():
+            total = sum(1 for _ in workdir.glob('*/*.md'))
+        else:
+            total = generate_corpus(workdir, args)
+        if args.in_memory:
+            wall, _ = run_in_memory(workdir, args.engine, search=False if args.no_search else None)
+            search = None
+        else:
+            wall = run_pipeline(workdir, args.jobs, args.engine, args.io_workers, args.queue_depth)
+            search = bench_search(workdir / convert.OUTPUT_DIR / convert.SEARCH_DIR, args.queries, args.seed)
+    finally:
+        if not args.corpus and not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        'corpus': {
+            'categories': args.categories, 'articles_per_category': args.articles,
+            'size': args.size, 'code': args.code, 'tables': args.tables,
+            'math': args.math, 'lists': args.lists, 'assets': args.assets,
+        },
+        'jobs': args.jobs,
+        'io_workers': args.io_workers,
+        'in_memory': args.in_memory,
+        'no_search': args.in_memory and args.no_search,
+        'engine': args.engine or convert.DEFAULT_MARKDOWN_ENGINE,
+        'articles': total,
+        'wall_seconds': round(wall, 4),
+        'articles_per_sec': round(total / wall, 1) if wall else None,
+        'stages': {name: round(seconds, 4) for name, seconds in sorted(convert.TIMER.seconds.items())},
+        'peak_rss_mb': peak_rss_mb(),
+        'search': search,
+    }
+    print_result(result)
+    if args.keep and not args.corpus:
+        print(f"合成文档树保留在: {workdir}")
+
+    status = 0
+    if args.baseline:
+        status = compare_baseline(result, args.baseline, args.tolerance)
+    if args.save_baseline:
+        Path(args.save_baseline).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"基准结果已保存到 {args.save_baseline}")
+    return status
+
+
+def print_result(result):
+    mode = "  内存构建（SiteBuilder）" if result.get('in_memory') else ""
+    if result.get('no_search'):
+        mode += "，不生成搜索索引"
+    print(f"文章数: {result['articles']}  进程数: {result['jobs']}  I/O 线程: {result.get('io_workers', 0)}  引擎: {result['engine']}{mode}")
+    print(f"总耗时: {result['wall_seconds']:.3f} s  吞吐: {result['articles_per_sec']} 篇/秒")
+    if result['peak_rss_mb'] is not None:
+        print(f"峰值内存: {result['peak_rss_mb']} MB")
+    note = "（进程池模式下为各进程累计）" if result['jobs'] > 1 else ""
+    if result['stages']:
+        print(f"分阶段耗时{note}:")
+    for name, seconds in result['stages'].items():
+        print(f"  {name:<10}{seconds:>10.3f} s")
+    search = result.get('search')
+    if search:
+        print(f"搜索索引: {search['index_kb']} KB（docs.json {search['docs_kb']} KB，{search['shards']} 个分片）")
+        print(f"查询延迟（冷加载，{search['queries']} 次）: p50 {search['query_ms_p50']} ms  最大 {search['query_ms_max']} ms")
+
+
+def compare_baseline(result, baseline_path, tolerance):
+    """与保存的基准结果对比；吞吐下降或内存上涨超过 tolerance 时返回 1"""
+    baseline = json.loads(Path(baseline_path).read_text(encoding='utf-8'))
+    if any(baseline.get(key, 0) != result[key] for key in ('corpus', 'jobs', 'io_workers', 'engine')) \
+            or baseline.get('in_memory', False) != result['in_memory']:
+        print("[警告] 基准结果的语料参数、进程数、I/O 线程数、引擎或构建方式与本次不同，对比仅供参考")
+
+    regressions = []
+    print(f"与基准 {baseline_path} 对比:")
+    checks = [
+        ('articles_per_sec', result['articles_per_sec'], baseline.get('articles_per_sec'), True),
+        ('peak_rss_mb', result['peak_rss_mb'], baseline.get('peak_rss_mb'), False),
+    ]
+    checks += [
+        (f"stage:{name}", seconds, baseline.get('stages', {}).get(name), False)
+        for name, seconds in result['stages'].items()
+    ]
+    # 索引大小参与回归判定；查询延迟与分阶段耗时一样只作参考
+    search, baseline_search = result.get('search') or {}, baseline.get('search') or {}
+    checks += [
+        ('search_index_kb', search.get('index_kb'), baseline_search.get('index_kb'), False),
+        ('stage:search_query_p50', search.get('query_ms_p50'), baseline_search.get('query_ms_p50'), False),
+    ]
+    for name, current, previous, higher_is_better in checks:
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        print(f"  {name:<22}{previous:>12.4g}{current:>12.4g}{change:>+10.1%}")
+        worse = -change if higher_is_better else change
+        if not name.startswith('stage:') and worse > tolerance:
+            regressions.append(name)
+    if regressions:
+        print(f"[回归] 超出容差 {tolerance:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+# ============================================================
+# 启动耗时基准
+# ============================================================
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出，返回 [(模块名, 缩进层级, 自身 µs, 累计 µs)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return rows
+
+
+def startup_env():
+    """子进程环境：允许写入 .pyc，与钩子中实际调用转换器时一致（首次运行后使用字节码缓存）"""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    return env
+
+
+def measure_import(repeat):
+    """多次在新进程中 import convert，返回 (导入 convert 的累计毫秒数中位数, 中位那次的直接依赖明细)"""
+    runs = []
+    for _ in range(repeat + 1):  # 第一次运行生成 .pyc，不计入
+        proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import convert'],
+                              cwd=Path(convert.__file__).parent, env=startup_env(),
+                              capture_output=True, text=True, check=True)
+        rows = parse_importtime(proc.stderr)
+        total = next(cumulative for name, depth, _, cumulative in rows if name == 'convert' and depth == 0)
+        runs.append((total, rows))
+    runs = sorted(runs[1:], key=lambda run: run[0])
+    total, rows = runs[len(runs) // 2]
+    children = sorted(((name, cumulative) for name, depth, _, cumulative in rows if depth == 1),
+                      key=lambda row: row[1], reverse=True)
+    return total / 1000, children
+
+
+def time_convert(corpus_dir, argv, as_module=True):
+    """在 corpus_dir 中运行一次转换器，返回毫秒数
+
+    as_module=True 时用 python -m convert（使用 .pyc），否则以脚本方式运行 convert.py（每次重新编译）。
+    """
+    env = startup_env()
+    if as_module:
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(Path(convert.__file__).parent), env.get('PYTHONPATH')]))
+        command = [sys.executable, '-m', 'convert', *argv]
+    else:
+        command = [sys.executable, convert.__file__, *argv]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=corpus_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def time_interpreter():
+    """空解释器（python -c pass）的启动毫秒数，用于从端到端时间中扣除"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], env=startup_env(), check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench_startup(args):
+    """测量转换器启动耗时
+
+    --target 针对扣除解释器自身启动时间后的单篇文章全量构建（python -m convert --force），
+    即导入 convert 加上构建第一篇文章的时间；超过时退出码为 1。
+    """
+    import_ms, children = measure_import(args.repeat)
+    interpreter = statistics.median(time_interpreter() for _ in range(args.repeat))
+    corpus_args = argparse.Namespace(categories=1, articles=1, size=args.size, code=0.15, tables=0.05,
+                                     math=0.05, lists=0.1, assets=0, asset_size=0, seed=0)
+    workdir = Path(tempfile.mkdtemp(prefix='convert-startup-'))
+    try:
+        generate_corpus(workdir, corpus_args)
+        # 第一次：没有构建清单（需要分析并写出全部页面）
+        cold = time_convert(workdir, [])
+        first_article = statistics.median(time_convert(workdir, ['--force']) for _ in range(args.repeat))
+        noop = statistics.median(time_convert(workdir, []) for _ in range(args.repeat))
+        script = statistics.median(time_convert(workdir, ['--force'], as_module=False) for _ in range(args.repeat))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"import convert: {import_ms:.1f} ms（-X importtime 中位数，{args.repeat} 次）")
+    for name, cumulative in children[:args.top]:
+        print(f"  {name:<24}{cumulative / 1000:>8.1f} ms")
+    print(f"解释器启动（python -c pass）: {interpreter:.1f} ms")
+    print(f"单篇文章端到端（python -m convert，含解释器启动）:")
+    print(f"  首次构建（无构建清单）      {cold:>10.1f} ms")
+    print(f"  --force 全量构建           {first_article:>10.1f} ms")
+    print(f"  无变化的增量构建           {noop:>10.1f} ms")
+    print(f"  --force（python convert.py）{script:>9.1f} ms  脚本方式每次重新编译 convert.py")
+    net = first_article - interpreter
+    if net > args.target:
+        print(f"[回归] 扣除解释器启动后单篇文章构建需 {net:.1f} ms，超过目标 {args.target:.0f} ms")
+        return 1
+    print(f"扣除解释器启动后单篇文章构建需 {net:.1f} ms，在目标 {args.target:.0f} ms 以内")
+    return 0
+
+
+# ============================================================
+# 文章记录内存基准
+# ============================================================
+
+def article_inputs(args):
+    """合成 process_category 构造文章记录时拿到的数据：(分类, md 文件名, 标题, 摘要, 字数)
+
+    标题与摘要在两种记录中共享同一对象，只比较记录自身以及各自额外保存的字符串（日期、filename / slug）。
+    """
+    rng = random.Random(args.seed)
+    newest = date(2026, 1, 1).toordinal()
+    categories = [f"cat-{c:02d}" for c in range(args.categories)]
+    inputs = []
+    for a in range(args.articles):
+        day = date.fromordinal(newest - rng.randrange(3650)).isoformat()
+        title = f"文章 {a} {rng.choice(WORDS)} {rng.choice(WORDS)}"
+        excerpt = ' '.join(rng.choice(WORDS) for _ in range(20))[:100] + "..."
+        inputs.append((categories[a % len(categories)], f"{day}-post-{a:06d}.md", title, excerpt, 500 + rng.randrange(5000)))
+    return inputs
+
+
+def dict_records(inputs):
+    """改用 Article 之前 process_category 返回的 dict"""
+    return [
+        {'title': title, 'date': name[:10], 'filename': f"{category}/{name[:-3]}.html",
+         'excerpt': excerpt, 'words': words, 'tag': category}
+        for category, name, title, excerpt, words in inputs
+    ]
+
+
+def article_records(inputs):
+    return [convert.Article(title, name[:10], category, name[:-3], excerpt, words)
+            for category, name, title, excerpt, words in inputs]
+
+
+def measure_records(build, inputs, sort_key):
+    """返回 (记录占用的字节数, 按日期排序的秒数)"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        records = build(inputs)
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    sort_seconds = min(timeit.repeat(lambda: sorted(records, key=sort_key, reverse=True), number=1, repeat=5))
+    return size, sort_seconds
+
+
+def bench_memory(args):
+    """对比 dict 与 Article 两种文章记录的内存占用与按日期排序的耗时"""
+    inputs = article_inputs(args)
+    rows = [
+        ('dict', *measure_records(dict_records, inputs, lambda article: article['date'])),
+        ('Article (__slots__)', *measure_records(article_records, inputs, attrgetter('ordinal'))),
+    ]
+    print(f"文章数: {args.articles}，分类数: {args.categories}（标题与摘要两种记录共享，不计入）")
+    print(f"{'记录类型':<22}{'内存':>12}{'每篇':>10}{'按日期排序':>14}")
+    for name, size, sort_seconds in rows:
+        print(f"{name:<22}{convert.format_bytes(size):>12}{size / args.articles:>8.0f} B{sort_seconds * 1000:>11.1f} ms")
+    (_, old_size, old_sort), (_, new_size, new_sort) = rows
+    print(f"Article 节省内存 {1 - new_size / old_size:.1%}，排序耗时为 dict 的 {new_sort / old_sort:.0%}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Markdown 转换器基准测试")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    micro = sub.add_parser('micro', help="单篇文章各转换步骤的耗时")
+    micro.add_argument('files', nargs='*', help="参与测试的 Markdown 文件（默认使用内置示例）")
+    micro.add_argument('-n', '--number', type=int, default=200, help="每项测量的重复次数")
+    micro.set_defaults(func=bench_micro)
+
+    run = sub.add_parser('run', help="生成合成文档树并完整运行转换流水线")
+    run.add_argument('--categories', type=int, default=4, help="分类数")
+    run.add_argument('--articles', type=int, default=250, help="每个分类的文章数")
+    run.add_argument('--size', type=int, default=4000, help="每篇文章的大致字符数")
+    run.add_argument('--code', type=float, default=0.15, help="代码块密度（每个块的概率）")
+    run.add_argument('--tables', type=float, default=0.05, help="表格密度")
+    run.add_argument('--math', type=float, default=0.05, help="公式块密度")
+    run.add_argument('--lists', type=float, default=0.1, help="列表密度")
+    run.add_argument('--assets', type=int, default=2, help="每个分类的非 md 资源文件数")
+    run.add_argument('--asset-size', type=int, default=256 * 1024, help="每个资源文件的字节数")
+    run.add_argument('--seed', type=int, default=0, help="随机种子（相同参数生成相同语料）")
+    run.add_argument('-j', '--jobs', type=int, default=1, help="传给 convert.py 的 --jobs")
+    run.add_argument('--engine', choices=sorted(convert.MARKDOWN_ENGINES), help="传给 convert.py 的 --engine")
+    run.add_argument('--io-workers', type=int, default=0, help="传给 convert.py 的 --io-workers")
+    run.add_argument('--queue-depth', type=int, default=16, help="传给 convert.py 的 --queue-depth")
+    run.add_argument('--in-memory', action='store_true',
+                     help="用 convert.SiteBuilder 在内存中构建（不写磁盘，不使用 --jobs / --io-workers）")
+    run.add_argument('--no-search', action='store_true', help="--in-memory 时不生成全文搜索索引")
+    run.add_argument('--corpus', help="使用（或生成到）指定目录，而不是临时目录")
+    run.add_argument('--keep', action='store_true', help="保留生成的临时文档树")
+    run.add_argument('--queries', type=int, default=50, help="测量搜索查询延迟的查询次数")
+    run.add_argument('--baseline', help="与保存的基准 JSON 对比，出现回归时退出码为 1")
+    run.add_argument('--save-baseline', help="将本次结果保存为基准 JSON")
+    run.add_argument('--tolerance', type=float, default=0.1, help="回归判定容差（默认 0.1 即 10%%）")
+    run.set_defaults(func=bench_run)
+
+    startup = sub.add_parser('startup', help="导入耗时与单篇文章构建的端到端时间")
+    startup.add_argument('--repeat', type=int, default=7, help="每项测量的重复次数（取中位数）")
+    startup.add_argument('--size', type=int, default=4000, help="示例文章的大致字符数")
+    startup.add_argument('--top', type=int, default=8, help="列出导入最慢的直接依赖数")
+    startup.add_argument('--target', type=float, default=50,
+                         help="扣除解释器启动后单篇文章全量构建的目标毫秒数（默认 50）")
+    startup.set_defaults(func=bench_startup)
+
+    memory = sub.add_parser('memory', help="文章记录的内存占用：dict 与 convert.Article 对比")
+    memory.add_argument('--articles', type=int, default=100000, help="文章数（默认 100000）")
+    memory.add_argument('--categories', type=int, default=20, help="分类数")
+    memory.add_argument('--seed', type=int, default=0, help="随机种子")
+    memory.set_defaults(func=bench_memory)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
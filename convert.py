@@ -2,31 +2,48 @@
 """
 Markdown 转 HTML 转换器
 将 docs 目录下的所有 md 文件转换为 HTML，支持 MathJax 和代码高亮
+
+频繁调用（例如 git 钩子）时建议使用 PYTHONPATH=<本目录> python -m convert：
+以脚本方式运行时 Python 每次都要重新编译 convert.py，-m 方式直接使用 __pycache__ 中的字节码。
+启动耗时见 python bench.py startup。
 """
 
 import os
 import re
-import shutil
-import yaml
-import subprocess
-import argparse
-import tempfile
-from urllib.parse import urlparse
+import json
+import time
+import heapq
+import hashlib
 from pathlib import Path
+from itertools import islice
+from operator import attrgetter
 from datetime import datetime
+from types import SimpleNamespace
+from functools import lru_cache
+from contextlib import contextmanager
+from collections import defaultdict, deque, Counter
+
+# 启动耗时：yaml、argparse、concurrent.futures、gzip / brotli、shutil、base64 只在用到时导入
+# （转换器常被钩子频繁调用，见 bench.py startup）
 
 # 配置
 DOCS_DIR = "."
 OUTPUT_DIR = "output"
 TEMPLATE_DIR = Path(__file__).parent.resolve()
 
+# 增量构建清单（位于输出目录下）
+BUILD_MANIFEST_NAME = ".build-manifest"
+# 转换器版本：修改渲染逻辑后需递增，使已有清单全部失效
+CONVERTER_VERSION = "1"
+
 # 默认配置
 DEFAULT_CONFIG = {
     "site": {
         "title": "Alex's Blog",
         "subtitle": "技术与思考",
         "author": "Alex",
-        "description": "个人博客"
+        "description": "个人博客",
+        "url": ""  # 站点根地址（例如 https://alex.github.io），sitemap.xml 与 Atom feed 需要绝对地址
     },
     "nav_menu": [
         {"name": "首页", "href": "index.html", "is_home": True},
@@ -50,12 +67,114 @@ DEFAULT_CONFIG = {
     "footer": {
         "copyright": "© 2026 Alex's Blog. All rights reserved.",
         "built_with": "Built with love using HTML, CSS & JavaScript"
+    },
+    "markdown": {
+        "engine": "tokenizer"
+    },
+    "pagination": {
+        "per_page": 0  # 分类索引页每页文章数，0 表示不分页
+    },
+    "search": {
+        "enabled": True  # 生成 search/ 下的全文搜索索引
+    },
+    "recent": {
+        "count": 6  # 首页“最近更新”列出的文章数，0 表示不显示
+    },
+    "archive": {
+        "enabled": True  # 生成 archive/index.html：全站文章按日期倒序、按年份分组
+    },
+    "sitemap": {
+        "enabled": None  # 生成 sitemap.xml（需要 site.url）；None 表示配置了 site.url 时生成
+    },
+    "feed": {
+        "enabled": None,  # 生成 Atom feed atom.xml（需要 site.url）；None 表示配置了 site.url 时生成
+        "count": 20  # feed 中的最新文章数
+    },
+    "minify": {
+        "enabled": False  # 精简生成的 HTML 以及复制的 styles.css / script.js
     }
 }
 
 # Category 映射（目录名 -> 显示名称）- 从 nav_menu 中自动提取
 CATEGORY_NAMES = {}
 
+# ============================================================
+# 预编译正则 - 导入时编译一次，转换与提取函数直接使用编译后的对象
+# ============================================================
+
+# 路径与文件名
+RE_INDEX_HTML_SUFFIX = re.compile(r'(^|/)index\.html$')
+RE_HTML_SUFFIX = re.compile(r'\.html$')
+RE_DATED_FILENAME = re.compile(r'^(\d{4}-\d{2}-\d{2})-.+\.md$')
+
+# 标题与摘要提取
+RE_FIRST_HEADING = re.compile(r'^# (.+)$', re.MULTILINE)
+RE_TITLE_LINE = re.compile(r'^# .+$', re.MULTILINE)
+RE_EXCERPT_CODE_BLOCK = re.compile(r'```.*?```', re.DOTALL)
+RE_EXCERPT_INLINE_CODE = re.compile(r'`[^`]+`')
+RE_EXCERPT_IMAGE = re.compile(r'!\[.*?\]\(.*?\)')
+RE_EXCERPT_LINK = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+RE_EXCERPT_EMPHASIS = re.compile(r'[*_]+')
+RE_EXCERPT_SPECIAL = re.compile(r'[^\w\s\u4e00-\u9fff]')
+RE_WHITESPACE = re.compile(r'\s+')
+# 字数统计：每个 CJK 字符计一个字，连续的英文 / 数字计一个词
+RE_WORD_COUNT = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]|[A-Za-z0-9]+')
+
+# 精简（minify）：HTML 中原样保留的区域、注释与空白；CSS / JS 中的字符串与注释
+RE_MINIFY_HTML_PRESERVE = re.compile(
+    r'<(pre|textarea|script|style)\b.*?</\1>|<code\b.*?</code>|\$\$.*?\$\$|\$[^$\n]+\$',
+    re.DOTALL | re.IGNORECASE
+)
+RE_MINIFY_HTML_COMMENT = re.compile(r'<!--(?!\[if).*?-->', re.DOTALL)
+RE_MINIFY_NEWLINE_RUN = re.compile(r'[ \t\r\f\v]*\n\s*')
+RE_MINIFY_SPACE_RUN = re.compile(r'[ \t\r\f\v]{2,}|[\t\r\f\v]')
+RE_MINIFY_CSS_TOKEN = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|/\*.*?\*/', re.DOTALL)
+RE_MINIFY_CSS_PUNCT = re.compile(r'\s*([{};,>])\s*')
+RE_MINIFY_CSS_COLON = re.compile(r':\s+')
+RE_MINIFY_JS_TOKEN = re.compile(
+    r'("(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|`(?:\\.|[^`\\])*`)|(//[^\n]*|/\*.*?\*/)',
+    re.DOTALL
+)
+
+# 搜索分词：两个字符以上的英文 / 数字词、CJK 连续片段（与 script.js 中的 searchTokens 规则一致）；
+# 去掉链接地址与 HTML 标签
+# CJK 二元组与孤立单字的正则编译较慢，首次分词时才编译（见 search_cjk_patterns）
+SEARCH_CJK_CHARS = r'\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+RE_SEARCH_WORD = re.compile(r'[a-z0-9]{2,}')
+RE_SEARCH_STRIP = re.compile(r'\]\([^)]*\)|<[^>]+>')
+
+# Markdown 引擎的正则只在选用对应引擎时编译（见 regex_engine_patterns 与 token_engine_patterns），
+# 不为未使用的引擎付出导入时的编译开销
+
+# 单遍解析引擎（convert_markdown_to_html_tokens）：块级扫描器、行内扫描器
+BLOCK_SCANNER_PATTERN = r"""
+    (?P<fence>^```(?P<lang>\w*)[^\n]*\n(?P<code>[\s\S]*?)(?:^```[ \t]*$|\Z))
+  | (?P<math>^[ \t]*\$\$[\s\S]+?\$\$[ \t]*$)
+  | (?P<heading>^(?P<hashes>\#{1,6})[ ](?P<heading_text>.+)$)
+  | (?P<hr>^[-*_]{3,}[ \t]*$)
+  | (?P<table>^\|.+\|[ \t]*(?:\n\|.+\|[ \t]*)+$)
+  | (?P<quote>^>[ ]?.*(?:\n>[ ]?.*)*)
+  | (?P<ul>^[ \t]*[*-][ ].+(?:\n[ \t]*[*-][ ].+)*)
+  | (?P<ol>^[ \t]*\d+\.[ ].+(?:\n[ \t]*\d+\.[ ].+)*)
+  | (?P<html>^<(?:h[1-6]|p|ul|ol|li|pre|table|blockquote|hr|div|img|code|details|section|figure)\b.*$)
+  | (?P<para>^[ \t]*\S.*$)
+"""
+
+# 开头的前瞻列出各分支可能的首字符，扫描时跳过普通文字（尤其是中文正文）不必逐个尝试全部分支
+INLINE_SCANNER_PATTERN = r"""
+    (?=[`$<!\[*_~])
+    (?: (?P<code_ticks>`+)(?P<code>.+?)(?P=code_ticks)
+  | (?P<math>\$\$.+?\$\$|\$[^$\n]+\$)
+  | (?P<tag></?[A-Za-z][^<>]*>)
+  | !\[(?P<img_alt>[^\]]*)\]\((?P<img_src>[^)]+)\)
+  | \[(?P<link_text>[^\]]+)\]\((?P<link_href>[^)]+)\)
+  | \*\*(?P<strong>.+?)\*\*
+  | __(?P<strong_alt>[^_]+)__
+  | ~~(?P<del>[^~]+)~~
+  | (?<!\*)\*(?P<em>[^*]+)\*(?!\*)
+    )
+"""
+
 
 def normalize_category_key(href_or_dir: str) -> str:
     """将目录名或 href 规范化为 category key（用于 nav_menu 匹配）"""
@@ -64,13 +183,61 @@ def normalize_category_key(href_or_dir: str) -> str:
     # 去掉查询参数与锚点
     clean = href_or_dir.split("?", 1)[0].split("#", 1)[0].strip("/")
     # 去掉首页和 html 后缀
-    clean = re.sub(r'(^|/)index\.html$', '', clean)
-    clean = re.sub(r'\.html$', '', clean)
+    clean = RE_INDEX_HTML_SUFFIX.sub('', clean)
+    clean = RE_HTML_SUFFIX.sub('', clean)
     return clean.strip("/")
 
+def merge_config(user_config=None):
+    """在 DEFAULT_CONFIG 的副本上合并用户配置（一层深度合并），不修改 DEFAULT_CONFIG 本身"""
+    config = {key: dict(value) if isinstance(value, dict) else value for key, value in DEFAULT_CONFIG.items()}
+    for key, value in (user_config or {}).items():
+        if isinstance(value, dict) and key in config:
+            config[key].update(value)
+        else:
+            config[key] = value
+    return config
+
+
+def category_names(config):
+    """从 nav_menu 中提取 {category key: 显示名称}"""
+    names = {}
+    for item in config.get('nav_menu', []):
+        href = item.get('href', '')
+        name = item.get('name', '')
+        # 排除首页、外部链接和锚点
+        if href and not item.get('external') and not href.startswith('#') and not href.startswith('http'):
+            if not item.get('is_home'):
+                category_key = normalize_category_key(href)
+                if category_key:
+                    names[category_key] = name
+    return names
+
+
+def read_user_config(config_path):
+    """读取并解析配置文件（yaml 在此处才导入，不计入 import convert 的开销）"""
+    import yaml
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f)
+
+
+def category_display_name(category_name, names=None):
+    """分类的显示名称：优先取 nav_menu 中的配置（names 默认为 CATEGORY_NAMES）
+
+    未配置的嵌套分类由上级分类的显示名称与目录名拼成，例如 “机器学习 / optim”。
+    """
+    names = CATEGORY_NAMES if names is None else names
+    display_name = names.get(normalize_category_key(category_name))
+    if display_name:
+        return display_name
+    parent, _, leaf = category_name.rpartition('/')
+    if not parent:
+        return category_name
+    return f"{category_display_name(parent, names)} / {leaf}"
+
+
 def load_config():
     """加载配置文件"""
-    config = DEFAULT_CONFIG.copy()
+    user_config = None
 
     config_path = None
     for candidate in ("_config.yaml", "_config.yml"):
@@ -81,30 +248,16 @@ def load_config():
 
     if config_path:
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                user_config = yaml.safe_load(f)
-                if user_config:
-                    # 深度合并配置
-                    for key, value in user_config.items():
-                        if isinstance(value, dict) and key in config:
-                            config[key].update(value)
-                        else:
-                            config[key] = value
+            user_config = read_user_config(config_path)
         except Exception as e:
             print(f"[警告] 加载配置文件失败: {e}")
 
+    # 深度合并配置
+    config = merge_config(user_config)
+
     # 从 nav_menu 中提取 Category 映射
-    global CATEGORY_NAMES
     CATEGORY_NAMES.clear()
-    for item in config.get('nav_menu', []):
-        href = item.get('href', '')
-        name = item.get('name', '')
-        # 排除首页、外部链接和锚点
-        if href and not item.get('external') and not href.startswith('#') and not href.startswith('http'):
-            if not item.get('is_home'):
-                category_key = normalize_category_key(href)
-                if category_key:
-                    CATEGORY_NAMES[category_key] = name
+    CATEGORY_NAMES.update(category_names(config))
 
     return config
 
@@ -243,6 +396,19 @@ ARTICLE_CARD = """<article class="blog-card">
     <a href="{link}" class="card-link">阅读全文 →</a>
 </article>"""
 
+# 分类索引页分页导航（只有一页时不输出）
+CATEGORY_PAGINATION = """
+    <nav class="pagination">
+        <div class="container">
+            {prev}
+            <span class="pagination-info">第 {page} / {page_count} 页</span>
+            {next}
+        </div>
+    </nav>"""
+
+PAGINATION_LINK = '<a href="{href}" class="{css_class}">{label}</a>'
+PAGINATION_DISABLED = '<span class="{css_class} disabled">{label}</span>'
+
 
 # ---------- 首页模块 ----------
 
@@ -267,10 +433,90 @@ HERO_SECTION = """    <section class="hero" id="about">
     </section>"""
 
 
+# 首页分类卡片
+CATEGORY_CARD = """                <a href="{href}" class="category-card">
+                    <span class="category-card-name">{display_name}</span>
+                    <span class="category-card-count">{count} 篇</span>
+                </a>
+"""
+
+# 社交链接按钮
+SOCIAL_BUTTON = """                <a href="{url}" class="social-btn" aria-label="{name}" {target}>
+                    <svg viewBox="0 0 24 24" width="20" height="20" fill="currentColor">
+                        {icon_path}
+                    </svg>
+                </a>
+"""
+
+# 社交图标的 SVG path（按 icon 名称，未知图标使用 github）
+SOCIAL_ICONS = {
+    'github': '<path d="M12 0C5.37 0 0 5.37 0 12c0 5.31 3.435 9.795 8.205 11.385.6.105.825-.255.825-.57 0-.285-.015-1.23-.015-2.235-3.015.555-3.795-.735-4.035-1.41-.135-.345-.72-1.41-1.23-1.695-.42-.225-1.02-.78-.015-.795.945-.015 1.62.87 1.845 1.23 1.08 1.815 2.805 1.305 3.495.99.105-.78.42-1.305.765-1.605-2.67-.3-5.46-1.335-5.46-5.925 0-1.305.465-2.385 1.23-3.225-.12-.3-.54-1.53.12-3.18 0 0 1.005-.315 3.3 1.23.96-.27 1.98-.405 3-.405s2.04.135 3 .405c2.295-1.56 3.3-1.23 3.3-1.23.66 1.65.24 2.88.12 3.18.765.84 1.23 1.905 1.23 3.225 0 4.605-2.805 5.625-5.475 5.925.435.375.81 1.095.81 2.22 0 1.605-.015 2.895-.015 3.3 0 .315.225.69.825.57A12.02 12.02 0 0024 12c0-6.63-5.37-12-12-12z"/>',
+    'twitter': '<path d="M18.244 2.25h3.308l-7.227 8.26 8.502 11.24H16.17l-5.214-6.817L4.99 21.75H1.68l7.73-8.835L1.254 2.25H8.08l4.713 6.231zm-1.161 17.52h1.833L7.084 4.126H5.117z"/>',
+    'email': '<path d="M20 4H4c-1.1 0-1.99.9-1.99 2L2 18c0 1.1.9 2 2 2h16c1.1 0 2-.9 2-2V6c0-1.1-.9-2-2-2zm0 4l-8 5-8-5V6l8 5 8-5v2z"/>'
+}
+
+# 首页“最近更新”区域（跨分类的最新文章）
+RECENT_POSTS = """    <section class="blog-section" id="recent">
+        <div class="container">
+            <div class="section-header">
+                <h2 class="section-title">最近更新</h2>
+            </div>
+            <ul class="post-list">
+{posts}            </ul>
+{more_link}        </div>
+    </section>"""
+
+RECENT_MORE_LINK = """            <a href="{href}" class="card-link post-list-more">全部文章 →</a>
+"""
+
+# 文章列表条目（首页最近更新与归档页共用）
+POST_LIST_ITEM = """                <li class="post-item">
+                    <time class="post-date">{date}</time>
+                    <a href="{link}" class="post-title">{title}</a>
+                    <span class="card-tag">{tag}</span>
+                </li>
+"""
+
+
+# ---------- 归档页模块 ----------
+
+# 归档页按年份分组的文章列表
+ARCHIVE_CONTENT = """    <section class="blog-section">
+        <div class="container">
+{years}        </div>
+    </section>"""
+
+ARCHIVE_YEAR_HEAD = """            <h2 class="archive-year">{year}</h2>
+            <ul class="post-list">
+"""
+ARCHIVE_YEAR_TAIL = """            </ul>
+"""
+
+
 # ============================================================
 # 模板组装函数 - 按生成顺序
 # ============================================================
 
+def split_template(template, field):
+    """在占位符 {field} 处将模板拆成前后两段，用于流式输出大字段"""
+    head, sep, tail = template.partition('{' + field + '}')
+    if not sep:
+        raise ValueError(f"模板中不存在占位符: {field}")
+    return head, tail
+
+
+# 需要流式输出的大字段：文章正文、文章卡片列表与归档列表
+ARTICLE_CONTENT_HEAD, ARTICLE_CONTENT_TAIL = split_template(ARTICLE_CONTENT, 'content')
+CATEGORY_CONTENT_HEAD, CATEGORY_CONTENT_TAIL = split_template(CATEGORY_CONTENT, 'articles')
+ARCHIVE_CONTENT_HEAD, ARCHIVE_CONTENT_TAIL = split_template(ARCHIVE_CONTENT, 'years')
+
+
+def write_page(output_path, fragments):
+    """将页面片段逐段写入文件，不在内存中拼出整页"""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.writelines(fragments)
+
+
 def build_nav_html(config, active_href=''):
     """构建导航栏 HTML - 直接使用 config 中的 href"""
     nav_menu = config.get('nav_menu', [])
@@ -279,7 +525,7 @@ def build_nav_html(config, active_href=''):
     # 首页链接
     home_link = "/"
 
-    nav_items = ""
+    nav_items = []
     for item in nav_menu:
         href = item.get('href', '#')
         name = item.get('name', '')
@@ -291,12 +537,12 @@ def build_nav_html(config, active_href=''):
         # 外部链接处理
         target = 'target="_blank"' if is_external or href.startswith('http') or href.startswith('mailto:') else ''
 
-        nav_items += f'<li><a href="{href}" class="nav-link {is_active}" {target}>{name}</a></li>\n                '
+        nav_items.append(f'<li><a href="{href}" class="nav-link {is_active}" {target}>{name}</a></li>\n                ')
 
     return HTML_NAV.format(
         home_link=home_link,
         site_title=site_title,
-        nav_items=nav_items
+        nav_items=''.join(nav_items)
     )
 
 
@@ -313,172 +559,347 @@ def build_footer_html(config, author=''):
     )
 
 
-def build_article_html(config, title, date, category, content, prev_link, next_link, relative_path=''):
-    """组装文章页面 HTML"""
-    site = config.get('site', {})
+# 页面头部在 {title} 处拆开：标题前为常量，标题后只依赖资源路径与额外头部
+HTML_HEAD_BEFORE_TITLE, HTML_HEAD_AFTER_TITLE = split_template(HTML_HEAD, 'title')
+
+
+class PageChrome:
+    """页面公共片段缓存：导航栏、页脚、页面头部与脚本引用
+
+    这些片段只依赖配置（以及导航栏的 active_href），每次构建每种组合只渲染一次，
+    之后所有文章页、分类索引页和首页直接复用。
+    """
+
+    def __init__(self, config, config_hash=None):
+        self.config = config
+        self.config_hash = config_hash or hash_config(config)
+        self._nav = {}
+        self._head = {}
+        self._scripts = {}
+        self._footer = None
+
+    def nav(self, active_href=''):
+        html = self._nav.get(active_href)
+        if html is None:
+            html = self._nav[active_href] = build_nav_html(self.config, active_href)
+        return html
+
+    def footer(self):
+        if self._footer is None:
+            self._footer = build_footer_html(self.config)
+        return self._footer
+
+    def head(self, title, css_path, extra_head=''):
+        """返回页面头部片段（标题之外的部分已预先渲染）"""
+        key = (css_path, extra_head)
+        tail = self._head.get(key)
+        if tail is None:
+            tail = self._head[key] = HTML_HEAD_AFTER_TITLE.format(css_path=css_path, extra_head=extra_head)
+        return HTML_HEAD_BEFORE_TITLE + title + tail
+
+    def scripts(self, script_path):
+        html = self._scripts.get(script_path)
+        if html is None:
+            html = self._scripts[script_path] = HTML_BASE_SCRIPTS.format(script_path=script_path)
+        return html
+
+
+# 进程内的 PageChrome 缓存，键为配置哈希（进程池中每个子进程各自维护一份）
+_PAGE_CHROME_CACHE = {}
+
+
+def get_page_chrome(config, config_hash=None):
+    """获取与配置对应的 PageChrome；已知配置哈希时传入以免重复计算"""
+    config_hash = config_hash or hash_config(config)
+    chrome = _PAGE_CHROME_CACHE.get(config_hash)
+    if chrome is None:
+        chrome = _PAGE_CHROME_CACHE[config_hash] = PageChrome(config, config_hash)
+    return chrome
+
+
+def iter_article_html(config, title, date, category, content, prev_link, next_link, relative_path='', chrome=None):
+    """按顺序产出文章页面 HTML 片段"""
+    chrome = chrome or get_page_chrome(config)
+    site_title = config.get('site', {}).get('title', "Alex's Blog")
 
     # 计算资源路径
     css_path = '/'
     script_path = '/'
 
-    # 构建各部分
-    head_title = f"{title} | {site.get('title', 'Alex\'s Blog')}"
+    yield chrome.head(f"{title} | {site_title}", css_path, ARTICLE_EXTRA_HEAD)
+    yield chrome.nav('')
+    yield ARTICLE_CONTENT_HEAD.format(date=date, category=category, title=title)
+    yield content
+    yield ARTICLE_CONTENT_TAIL.format(prev_link=prev_link, next_link=next_link)
+    yield chrome.footer()
+    yield chrome.scripts(script_path)
 
-    html = HTML_HEAD.format(
-        title=head_title,
-        css_path=css_path,
-        extra_head=ARTICLE_EXTRA_HEAD
-    )
 
-    html += build_nav_html(config, active_href='')
-    html += ARTICLE_CONTENT.format(
-        date=date,
-        category=category,
-        title=title,
-        content=content,
-        prev_link=prev_link,
-        next_link=next_link
-    )
-    html += build_footer_html(config)
-    html += HTML_BASE_SCRIPTS.format(script_path=script_path)
+def build_article_html(config, title, date, category, content, prev_link, next_link, relative_path='', chrome=None):
+    """组装文章页面 HTML"""
+    return ''.join(iter_article_html(config, title, date, category, content, prev_link, next_link, relative_path, chrome))
 
-    return html
 
+def category_page_path(page):
+    """第 page 页分类索引页相对分类目录的路径：index.html、page/2/index.html ..."""
+    return "index.html" if page == 1 else f"page/{page}/index.html"
 
-def build_category_index_html(config, category_name, display_name, articles, relative_path=''):
-    """组装 Category 索引页 HTML"""
-    site = config.get('site', {})
 
-    # 计算资源路径（Category 页在子目录，默认使用 ../）
-    css_path = relative_path if relative_path else '../'
-    script_path = relative_path if relative_path else '../'
+def category_page_link(from_page, to_page):
+    """从第 from_page 页指向第 to_page 页的相对链接"""
+    root = '' if from_page == 1 else '../../'
+    if to_page == 1:
+        return root or './'
+    return f"{root}page/{to_page}/"
+
 
-    # 构建各部分
-    head_title = f"{display_name} | {site.get('title', '')}"
+def paginate(articles, per_page):
+    """按每页文章数切分文章列表；per_page 为 0 时不分页（始终至少一页）"""
+    if not per_page or per_page <= 0 or len(articles) <= per_page:
+        return [articles]
+    return [articles[i:i + per_page] for i in range(0, len(articles), per_page)]
 
-    html = HTML_HEAD.format(
-        title=head_title,
-        css_path=css_path,
-        extra_head=''
+
+def build_pagination_html(page, page_count):
+    """构建分页导航；只有一页时返回空字符串"""
+    if page_count <= 1:
+        return ''
+
+    def link(target, css_class, label):
+        if 1 <= target <= page_count:
+            return PAGINATION_LINK.format(href=category_page_link(page, target), css_class=css_class, label=label)
+        return PAGINATION_DISABLED.format(css_class=css_class, label=label)
+
+    return CATEGORY_PAGINATION.format(
+        prev=link(page - 1, 'pagination-prev', '← 较新文章'),
+        next=link(page + 1, 'pagination-next', '较早文章 →'),
+        page=page,
+        page_count=page_count
     )
 
+
+def iter_category_index_html(config, category_name, display_name, articles, relative_path='', chrome=None,
+                             page=1, page_count=1, article_count=None):
+    """按顺序产出 Category 索引页 HTML 片段（每张文章卡片一个片段）
+
+    分页时 articles 只是第 page 页的文章，article_count 为分类文章总数。
+    """
+    chrome = chrome or get_page_chrome(config)
+    site = config.get('site', {})
+    if article_count is None:
+        article_count = len(articles)
+
+    # 计算资源路径（Category 页在子目录，默认使用 ../，嵌套分类每深一层多一个 ../；第 2 页起位于 page/N/ 下）
+    up = '' if page == 1 else '../../'
+    root = up + '../' * (category_name.count('/') + 1)
+    css_path = relative_path if relative_path else root
+    script_path = relative_path if relative_path else root
+
+    title = display_name if page == 1 else f"{display_name} - 第 {page} 页"
+    yield chrome.head(f"{title} | {site.get('title', '')}", css_path)
+
     # 导航栏
-    html += build_nav_html(config, active_href=category_name)
+    yield chrome.nav(category_name)
 
     # Category 头部
-    html += CATEGORY_HEADER.format(
+    yield CATEGORY_HEADER.format(
         category_name=display_name,
-        article_count=len(articles)
+        article_count=article_count
     )
 
     # 文章列表
-    cards_html = ""
+    yield CATEGORY_CONTENT_HEAD
+    prefix = len(category_name) + 1
     for article in articles:
-        # 去掉 category_name/ 前缀和 .html 后缀
-        filename = article['filename'].replace(f'{category_name}/', '').replace('.html', '')
-        cards_html += ARTICLE_CARD.format(
-            date=article['date'],
+        # 去掉开头的 category_name/ 和 .html 后缀（子分类的文章保留子目录，例如 rag-agent/xxx）
+        filename = up + article.filename[prefix:-len('.html')]
+        yield ARTICLE_CARD.format(
+            date=article.date,
             tag=display_name,
-            title=article['title'],
-            excerpt=article['excerpt'],
+            title=article.title,
+            excerpt=article.excerpt,
             link=filename
         ) + "\n"
+    yield CATEGORY_CONTENT_TAIL
+    yield build_pagination_html(page, page_count)
 
-    html += CATEGORY_CONTENT.format(articles=cards_html)
-    html += build_footer_html(config)
-    html += HTML_BASE_SCRIPTS.format(script_path=script_path)
+    yield chrome.footer()
+    yield chrome.scripts(script_path)
 
-    return html
 
+def build_category_index_html(config, category_name, display_name, articles, relative_path='', chrome=None,
+                              page=1, page_count=1, article_count=None):
+    """组装 Category 索引页 HTML"""
+    return ''.join(iter_category_index_html(config, category_name, display_name, articles, relative_path, chrome,
+                                            page, page_count, article_count))
 
-def build_index_html(config, categories_info):
-    """组装首页 HTML"""
+
+def iter_post_list_items(articles, names, up=''):
+    """按顺序产出文章列表条目；articles 为 Article 序列，names 见 category_names"""
+    for article in articles:
+        yield POST_LIST_ITEM.format(
+            date=article.date,
+            link=f"{up}{article.category}/{article.slug}",
+            title=article.title,
+            tag=category_display_name(article.category, names)
+        )
+
+
+def iter_index_html(config, categories_info, chrome=None, recent=None):
+    """按顺序产出首页 HTML 片段；recent 为最近更新的文章（见 ArticleIndex.recent）"""
+    chrome = chrome or get_page_chrome(config)
     site = config.get('site', {})
-    nav_menu = config.get('nav_menu', [])
     hero = config.get('hero', {})
     social = config.get('social', [])
-    footer = config.get('footer', {})
+    site_title = site.get('title', "Alex's Blog")
 
-    # 构建各部分
-    head_title = f"{site.get('title', 'Alex\'s Blog')} | {site.get('subtitle', '技术与思考')}"
-
-    html = HTML_HEAD.format(
-        title=head_title,
-        css_path='/',
-        extra_head=''
-    )
+    yield chrome.head(f"{site_title} | {site.get('subtitle', '技术与思考')}", '/')
 
     # 导航栏（首页激活）
-    html += build_nav_html(config, active_href='index.html')
-
-    # 生成导航菜单项（用于首页）
-    nav_html = ""
-    for item in nav_menu:
-        href = item.get('href', '#')
-        name = item.get('name', '')
-        is_active = 'active' if item.get('is_home') else ''
-        external = 'target="_blank"' if item.get('external') else ''
-        nav_html += f'<li><a href="{href}" class="nav-link {is_active}" {external}>{name}</a></li>\n                '
+    yield chrome.nav('index.html')
 
     # 生成分类卡片
-    category_cards = ""
+    category_cards = []
     for cat in categories_info:
-        cat_href = cat.get('href', cat['name'])
-        category_cards += f"""                <a href="{cat_href}" class="category-card">
-                    <span class="category-card-name">{cat['display_name']}</span>
-                    <span class="category-card-count">{cat['count']} 篇</span>
-                </a>
-"""
+        category_cards.append(CATEGORY_CARD.format(
+            href=cat.get('href', cat['name']),
+            display_name=cat['display_name'],
+            count=cat['count']
+        ))
 
     # 生成社交链接
-    social_icons = {
-        'github': '<path d="M12 0C5.37 0 0 5.37 0 12c0 5.31 3.435 9.795 8.205 11.385.6.105.825-.255.825-.57 0-.285-.015-1.23-.015-2.235-3.015.555-3.795-.735-4.035-1.41-.135-.345-.72-1.41-1.23-1.695-.42-.225-1.02-.78-.015-.795.945-.015 1.62.87 1.845 1.23 1.08 1.815 2.805 1.305 3.495.99.105-.78.42-1.305.765-1.605-2.67-.3-5.46-1.335-5.46-5.925 0-1.305.465-2.385 1.23-3.225-.12-.3-.54-1.53.12-3.18 0 0 1.005-.315 3.3 1.23.96-.27 1.98-.405 3-.405s2.04.135 3 .405c2.295-1.56 3.3-1.23 3.3-1.23.66 1.65.24 2.88.12 3.18.765.84 1.23 1.905 1.23 3.225 0 4.605-2.805 5.625-5.475 5.925.435.375.81 1.095.81 2.22 0 1.605-.015 2.895-.015 3.3 0 .315.225.69.825.57A12.02 12.02 0 0024 12c0-6.63-5.37-12-12-12z"/>',
-        'twitter': '<path d="M18.244 2.25h3.308l-7.227 8.26 8.502 11.24H16.17l-5.214-6.817L4.99 21.75H1.68l7.73-8.835L1.254 2.25H8.08l4.713 6.231zm-1.161 17.52h1.833L7.084 4.126H5.117z"/>',
-        'email': '<path d="M20 4H4c-1.1 0-1.99.9-1.99 2L2 18c0 1.1.9 2 2 2h16c1.1 0 2-.9 2-2V6c0-1.1-.9-2-2-2zm0 4l-8 5-8-5V6l8 5 8-5v2z"/>'
-    }
-
-    social_html = ""
+    social_html = []
     for item in social:
         url = item.get('url', '#')
-        name = item.get('name', '')
         icon = item.get('icon', 'github')
-        icon_path = social_icons.get(icon, social_icons['github'])
-        target = 'target="_blank"' if item.get('external') or url.startswith('http') else ''
-        social_html += f"""                <a href="{url}" class="social-btn" aria-label="{name}" {target}>
-                    <svg viewBox="0 0 24 24" width="20" height="20" fill="currentColor">
-                        {icon_path}
-                    </svg>
-                </a>
-"""
+        social_html.append(SOCIAL_BUTTON.format(
+            url=url,
+            name=item.get('name', ''),
+            target='target="_blank"' if item.get('external') or url.startswith('http') else '',
+            icon_path=SOCIAL_ICONS.get(icon, SOCIAL_ICONS['github'])
+        ))
 
     # Hero 标题替换 author
     hero_title = hero.get('title', '').format(author=site.get('author', 'Alex'))
 
-    html += HERO_SECTION.format(
+    yield HERO_SECTION.format(
         hero_title=hero_title,
         hero_subtitle=hero.get('subtitle', ''),
         hero_bio=hero.get('bio', '').replace(chr(10), '<br>'),
-        category_cards=category_cards,
-        social_icons=social_html
+        category_cards=''.join(category_cards),
+        social_icons=''.join(social_html)
     )
 
-    html += build_footer_html(config)
-    html += HTML_BASE_SCRIPTS.format(script_path='/')
+    if recent:
+        more_link = RECENT_MORE_LINK.format(href=f"{ARCHIVE_DIR}/") if archive_enabled(config) else ''
+        posts = ''.join(iter_post_list_items(recent, category_names(config)))
+        yield RECENT_POSTS.format(posts=posts, more_link=more_link)
 
-    return html
+    yield chrome.footer()
+    yield chrome.scripts('/')
+
+
+def build_index_html(config, categories_info, chrome=None, recent=None):
+    """组装首页 HTML"""
+    return ''.join(iter_index_html(config, categories_info, chrome, recent))
+
+
+def iter_archive_html(config, articles, article_count, chrome=None):
+    """按顺序产出归档页 HTML 片段：articles 为按日期倒序的 Article（可以是惰性迭代器），按年份分组"""
+    chrome = chrome or get_page_chrome(config)
+    site = config.get('site', {})
+
+    yield chrome.head(f"归档 | {site.get('title', '')}", '../')
+    yield chrome.nav(ARCHIVE_DIR)
+    yield CATEGORY_HEADER.format(category_name="归档", article_count=article_count)
+
+    yield ARCHIVE_CONTENT_HEAD
+    names = category_names(config)
+    year = None
+    for article in articles:
+        article_year = datetime.fromordinal(article.ordinal).year
+        if article_year != year:
+            if year is not None:
+                yield ARCHIVE_YEAR_TAIL
+            year = article_year
+            yield ARCHIVE_YEAR_HEAD.format(year=year)
+        yield from iter_post_list_items((article,), names, up='../')
+    if year is not None:
+        yield ARCHIVE_YEAR_TAIL
+    yield ARCHIVE_CONTENT_TAIL
+
+    yield chrome.footer()
+    yield chrome.scripts('../')
 
 
 # ============================================================
 # Markdown 转换函数
 # ============================================================
 
-def convert_markdown_to_html(markdown_text):
+# 代码块（带语言标签与复制按钮）
+CODE_BLOCK_HTML = '<div class="code-block"><div class="code-header"><span class="code-lang">{lang}</span><button class="code-copy" onclick="copyCode(this)" aria-label="Copy code"><svg viewBox="0 0 24 24" width="16" height="16" fill="currentColor"><path d="M16 1H4c-1.1 0-2 .9-2 2v14h2V3h12V1zm3 4H8c-1.1 0-2 .9-2 2v14c0 1.1.9 2 2 2h11c1.1 0 2-.9 2-2V7c0-1.1-.9-2-2-2zm0 16H8V7h11v14z"/></svg></button></div><pre><code class="language-{lang}">{content}</code></pre></div>'
+
+# 可选的转换引擎：tokenizer（单遍解析，默认）与 regex（旧的逐条正则替换，保留用于对比）
+DEFAULT_MARKDOWN_ENGINE = "tokenizer"
+
+
+def convert_markdown_to_html(markdown_text, engine=DEFAULT_MARKDOWN_ENGINE):
     """将 Markdown 转换为 HTML"""
+    try:
+        converter = MARKDOWN_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"未知的 Markdown 引擎: {engine}") from None
+    return converter(markdown_text)
+
+
+@lru_cache(maxsize=None)
+def regex_engine_patterns():
+    """正则替换引擎（convert_markdown_to_html_regex）使用的正则
+
+    只在选用 regex 引擎时编译（与 search_cjk_patterns 一样不在导入时编译），属性名为去掉 RE_ 前缀的名称。
+    """
+    return SimpleNamespace(
+        RAW_BLOCK_TAG=re.compile(r'<(pre|code|table|tr|td|th|blockquote)(?:\s|>)'),
+        CODE_BLOCK=re.compile(r'```(\w*)\n[\s\S]*?```'),
+        CODE_BLOCK_PARTS=re.compile(r'```(\w*)\n([\s\S]*)```'),
+        MATH_BLOCK=re.compile(r'\$\$.+?\$\$', re.DOTALL),
+        INLINE_CODE=re.compile(r'`([^`]+)`'),
+        HEADINGS=tuple(
+            (re.compile(rf'^{"#" * level} (.+)$', re.MULTILINE), rf'<h{level} id="\1">\1</h{level}>')
+            for level in range(6, 0, -1)
+        ),
+        MATH_INLINE_SPAN=re.compile(r'<span class="math-inline">[^$]*\$</span>'),
+        MATH_BLOCK_P=re.compile(r'<p class="math-block">.*?</p>', re.DOTALL),
+        STRONG_STAR=re.compile(r'\*\*(.+?)\*\*'),
+        STRONG_UNDERSCORE=re.compile(r'__(?![\s\S]*?[a-zA-Z0-9]_|[\s\S]*?\|)([^_]+)__'),
+        EM_STAR=re.compile(r'(?<!\*)\*([^*]+)\*(?!\*)'),
+        DEL=re.compile(r'~~([^~]+)~~'),
+        TABLE=re.compile(r'^\|.+\|(?:\n\|.+\|)+', re.MULTILINE),
+        LINK=re.compile(r'\[([^\]]+)\]\(([^)]+)\)'),
+        IMAGE=re.compile(r'!\[([^\]]*)\]\(([^)]+)\)'),
+        UL_ITEM=re.compile(r'^[*-] (.+)$', re.MULTILINE),
+        LI_RUN=re.compile(r'(<li>.*</li>\n?)+'),
+        OL_ITEM=re.compile(r'^\d+\. (.+)$', re.MULTILINE),
+        QUOTE_LINE=re.compile(r'^> (.+)$', re.MULTILINE),
+        QUOTE_RUN=re.compile(r'(<blockquote>.*</blockquote>\n?)+'),
+        QUOTE_INNER=re.compile(r'<blockquote>(.*?)</blockquote>'),
+        HR=re.compile(r'^[-*_]{3,}$', re.MULTILINE),
+        BLANK_LINES=re.compile(r'\n\n+'),
+        PARAGRAPH=re.compile(r'^(?!<[hupolbtd]|<ul|<ol|<li|<blockquote|<hr|<div|<img|<code)(.+)$', re.MULTILINE),
+        EMPTY_P=re.compile(r'<p>\s*</p>'),
+        P_BEFORE_BLOCK=re.compile(r'<p>\s*<(h[1-6]|ul|ol|li|blockquote|hr|div|code|pre|img)</'),
+        P_AFTER_BLOCK=re.compile(r'</(h[1-6]|ul|ol|li|blockquote|hr|div|pre)>\s*</p>'),
+    )
+
+
+def convert_markdown_to_html_regex(markdown_text):
+    """将 Markdown 转换为 HTML（正则替换引擎：对全文逐条执行 re.sub）"""
+    RE = regex_engine_patterns()
     html = markdown_text
 
     # 转义 HTML 特殊字符（但保留已存在的 HTML 标签）
     # 先处理代码块外部的内容
-    html = re.sub(r'<(pre|code|table|tr|td|th|blockquote)(?:\s|>)', r'<\1>', html)
+    html = RE.RAW_BLOCK_TAG.sub(r'<\1>', html)
 
     # 第一步：先处理代码块，保护其内容不被后续处理影响
     code_blocks = {}
@@ -491,7 +912,7 @@ def convert_markdown_to_html(markdown_text):
         return placeholder
 
     # 保护所有代码块
-    html = re.sub(r'```(\w*)\n[\s\S]*?```', protect_code_block, html)
+    html = RE.CODE_BLOCK.sub(protect_code_block, html)
 
     # 第二步：处理 MathJax 公式
     # 块级公式 $$...$$
@@ -505,7 +926,7 @@ def convert_markdown_to_html(markdown_text):
         return placeholder
 
     # 保护所有块级公式
-    html = re.sub(r'\$\$.+?\$\$', protect_math_block, html, flags=re.DOTALL)
+    html = RE.MATH_BLOCK.sub(protect_math_block, html)
 
     # 行内公式 $...$ - 直接保留，让 MathJax 处理
 
@@ -518,23 +939,19 @@ def convert_markdown_to_html(markdown_text):
         # 转换代码块内容
         code_content = original
         # 提取语言
-        lang_match = re.match(r'```(\w*)\n([\s\S]*)```', code_content)
+        lang_match = RE.CODE_BLOCK_PARTS.match(code_content)
         if lang_match:
             lang = lang_match.group(1) or 'text'
             content = lang_match.group(2)
-            code_content = f'<div class="code-block"><div class="code-header"><span class="code-lang">{lang}</span><button class="code-copy" onclick="copyCode(this)" aria-label="Copy code"><svg viewBox="0 0 24 24" width="16" height="16" fill="currentColor"><path d="M16 1H4c-1.1 0-2 .9-2 2v14h2V3h12V1zm3 4H8c-1.1 0-2 .9-2 2v14c0 1.1.9 2 2 2h11c1.1 0 2-.9 2-2V7c0-1.1-.9-2-2-2zm0 16H8V7h11v14z"/></svg></button></div><pre><code class="language-{lang}">{content}</code></pre></div>'
+            code_content = CODE_BLOCK_HTML.format(lang=lang, content=content)
         html = html.replace(placeholder, code_content)
 
     # 行内代码 `...`
-    html = re.sub(r'`([^`]+)`', r'<code class="inline-code">\1</code>', html)
+    html = RE.INLINE_CODE.sub(r'<code class="inline-code">\1</code>', html)
 
     # 标题
-    html = re.sub(r'^###### (.+)$', r'<h6 id="\1">\1</h6>', html, flags=re.MULTILINE)
-    html = re.sub(r'^##### (.+)$', r'<h5 id="\1">\1</h5>', html, flags=re.MULTILINE)
-    html = re.sub(r'^#### (.+)$', r'<h4 id="\1">\1</h4>', html, flags=re.MULTILINE)
-    html = re.sub(r'^### (.+)$', r'<h3 id="\1">\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^## (.+)$', r'<h2 id="\1">\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^# (.+)$', r'<h1 id="\1">\1</h1>', html, flags=re.MULTILINE)
+    for heading_re, heading_html in RE.HEADINGS:
+        html = heading_re.sub(heading_html, html)
 
     # 粗体 **...** 或 __...__ (排除 MathJax 公式内的)
     # 先将公式部分替换为占位符
@@ -549,17 +966,17 @@ def convert_markdown_to_html(markdown_text):
 
     # 保护 MathJax 公式（更精确的匹配）
     # 注意：需要匹配完整的标签内容
-    html = re.sub(r'<span class="math-inline">[^$]*\$</span>', replace_math, html)
-    html = re.sub(r'<p class="math-block">.*?</p>', replace_math, html, flags=re.DOTALL)
+    html = RE.MATH_INLINE_SPAN.sub(replace_math, html)
+    html = RE.MATH_BLOCK_P.sub(replace_math, html)
 
     # 粗体 **...** 或 __...__ (只匹配独立的，不在公式内)
     # 匹配整个 **...** 块（使用非贪婪匹配）
-    html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
+    html = RE.STRONG_STAR.sub(r'<strong>\1</strong>', html)
     # 匹配整个 __...__ 块，但排除下划线后跟字母数字的情况
-    html = re.sub(r'__(?![\s\S]*?[a-zA-Z0-9]_|[\s\S]*?\|)([^_]+)__', r'<strong>\1</strong>', html)
+    html = RE.STRONG_UNDERSCORE.sub(r'<strong>\1</strong>', html)
 
     # 斜体 *...* (只匹配独立的)
-    html = re.sub(r'(?<!\*)\*([^*]+)\*(?!\*)', r'<em>\1</em>', html)
+    html = RE.EM_STAR.sub(r'<em>\1</em>', html)
     # 斜体 _..._ (不处理，保留给公式下标使用)
 
     # 恢复 MathJax 公式
@@ -567,7 +984,7 @@ def convert_markdown_to_html(markdown_text):
         html = html.replace(placeholder, original)
 
     # 删除线 ~~...~~
-    html = re.sub(r'~~([^~]+)~~', r'<del>\1</del>', html)
+    html = RE.DEL.sub(r'<del>\1</del>', html)
 
     # 表格处理
     def convert_table(match):
@@ -622,214 +1039,2568 @@ def convert_markdown_to_html(markdown_text):
         return f'<table class="table">{thead}{tbody}</table>'
 
     # 匹配整个表格（至少2行，每行以 | 开头或结尾）
-    html = re.sub(r'^\|.+\|(?:\n\|.+\|)+', convert_table, html, flags=re.MULTILINE)
+    html = RE.TABLE.sub(convert_table, html)
 
     # 链接 [text](url)
-    html = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', html)
+    html = RE.LINK.sub(r'<a href="\2">\1</a>', html)
 
     # 图片 ![alt](url)
-    html = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)', r'<img src="\2" alt="\1" class="article-image">', html)
+    html = RE.IMAGE.sub(r'<img src="\2" alt="\1" class="article-image">', html)
 
     # 无序列表 - 或 *
-    html = re.sub(r'^[*-] (.+)$', r'<li>\1</li>', html, flags=re.MULTILINE)
-    html = re.sub(r'(<li>.*</li>\n?)+', r'<ul>\g<0></ul>', html)
+    html = RE.UL_ITEM.sub(r'<li>\1</li>', html)
+    html = RE.LI_RUN.sub(r'<ul>\g<0></ul>', html)
 
     # 有序列表
-    html = re.sub(r'^\d+\. (.+)$', r'<li>\1</li>', html, flags=re.MULTILINE)
+    html = RE.OL_ITEM.sub(r'<li>\1</li>', html)
 
     # 引用 > ...
-    html = re.sub(r'^> (.+)$', r'<blockquote>\1</blockquote>', html, flags=re.MULTILINE)
-    html = re.sub(r'(<blockquote>.*</blockquote>\n?)+', lambda m: '<blockquote>' + ''.join(re.findall(r'<blockquote>(.*?)</blockquote>', m.group(0))) + '</blockquote>', html)
+    html = RE.QUOTE_LINE.sub(r'<blockquote>\1</blockquote>', html)
+    html = RE.QUOTE_RUN.sub(lambda m: '<blockquote>' + ''.join(RE.QUOTE_INNER.findall(m.group(0))) + '</blockquote>', html)
 
     # 水平线 --- 或 *** 或 ___
-    html = re.sub(r'^[-*_]{3,}$', r'<hr>', html, flags=re.MULTILINE)
+    html = RE.HR.sub(r'<hr>', html)
 
     # 段落（用空行分隔）
-    html = re.sub(r'\n\n+', '\n', html)
-    html = re.sub(r'^(?!<[hupolbtd]|<ul|<ol|<li|<blockquote|<hr|<div|<img|<code)(.+)$', r'<p>\1</p>', html, flags=re.MULTILINE)
+    html = RE.BLANK_LINES.sub('\n', html)
+    html = RE.PARAGRAPH.sub(r'<p>\1</p>', html)
 
     # 清理空段落
-    html = re.sub(r'<p>\s*</p>', '', html)
-    html = re.sub(r'<p>\s*<(h[1-6]|ul|ol|li|blockquote|hr|div|code|pre|img)</', r'<\1', html)
-    html = re.sub(r'</(h[1-6]|ul|ol|li|blockquote|hr|div|pre)>\s*</p>', r'</\1>', html)
+    html = RE.EMPTY_P.sub('', html)
+    html = RE.P_BEFORE_BLOCK.sub(r'<\1', html)
+    html = RE.P_AFTER_BLOCK.sub(r'</\1>', html)
 
     return html
 
 
+# ---------- 单遍解析引擎 ----------
+# 块级扫描器：一个按行首锚定的多分支正则，finditer 一次扫过全文得到块序列（AST），
+# 行内内容再用一个多分支正则单遍切分，最后一次 join 输出。
+
+def escape_html(text):
+    """转义代码中的 HTML 特殊字符"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+@lru_cache(maxsize=None)
+def token_engine_patterns():
+    """单遍解析引擎使用的 (块级扫描器, 行内扫描器, 列表项前缀) 正则，首次转换时才编译"""
+    return (
+        re.compile(BLOCK_SCANNER_PATTERN, re.MULTILINE | re.VERBOSE),
+        re.compile(INLINE_SCANNER_PATTERN, re.VERBOSE),
+        re.compile(r'^[ \t]*(?:[*-]|\d+\.)[ ]'),
+    )
+
+
+def tokenize_markdown(markdown_text):
+    """将 Markdown 切分为块级节点列表
+
+    节点为 (类型, 数据...) 元组：
+    ('heading', level, text) / ('code', lang, code) / ('math', source) / ('hr',) /
+    ('table', lines) / ('quote', lines) / ('list', tag, items) / ('html', line) / ('para', text)
+    """
+    block_scanner, _, list_item_prefix = token_engine_patterns()
+    nodes = []
+    append = nodes.append
+    for m in block_scanner.finditer(markdown_text):
+        kind = m.lastgroup
+        if kind == 'fence':
+            append(('code', m.group('lang') or 'text', m.group('code')))
+        elif kind == 'heading':
+            append(('heading', len(m.group('hashes')), m.group('heading_text').strip()))
+        elif kind == 'math':
+            append(('math', m.group('math').strip()))
+        elif kind == 'hr':
+            append(('hr',))
+        elif kind == 'table':
+            append(('table', m.group('table').strip().split('\n')))
+        elif kind == 'quote':
+            append(('quote', [line[1:].strip() for line in m.group('quote').split('\n')]))
+        elif kind in ('ul', 'ol'):
+            items = [list_item_prefix.sub('', line, count=1) for line in m.group(kind).split('\n')]
+            append(('list', kind, items))
+        elif kind == 'html':
+            append(('html', m.group('html')))
+        else:
+            append(('para', m.group('para').strip()))
+    return nodes
+
+
+def render_inline(text):
+    """单遍渲染行内元素：代码、公式、原始标签、图片、链接、粗体、删除线、斜体
+
+    按 Match.lastgroup（每个分支最后闭合的命名组）分派，不逐个调用 group() 判断是哪个分支。
+    """
+    out = []
+    append = out.append
+    pos = 0
+    for m in token_engine_patterns()[1].finditer(text):
+        start = m.start()
+        if start > pos:
+            append(text[pos:start])
+        pos = m.end()
+        kind = m.lastgroup
+        if kind == 'code':
+            append(f'<code class="inline-code">{escape_html(m.group("code"))}</code>')
+        elif kind == 'math' or kind == 'tag':
+            # 公式原样保留给 MathJax；原始 HTML 标签原样输出
+            append(m.group(0))
+        elif kind == 'img_src':
+            append(f'<img src="{m.group("img_src")}" alt="{m.group("img_alt")}" class="article-image">')
+        elif kind == 'link_href':
+            append(f'<a href="{m.group("link_href")}">{render_inline(m.group("link_text"))}</a>')
+        elif kind == 'strong' or kind == 'strong_alt':
+            append(f'<strong>{render_inline(m.group(kind))}</strong>')
+        elif kind == 'del':
+            append(f'<del>{render_inline(m.group("del"))}</del>')
+        else:
+            append(f'<em>{render_inline(m.group("em"))}</em>')
+    if pos == 0:
+        return text
+    if pos < len(text):
+        append(text[pos:])
+    return ''.join(out)
+
+
+def _split_table_row(line):
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def render_table(lines):
+    """渲染表格节点（第二行为对齐行）"""
+    header_cells = _split_table_row(lines[0])
+
+    align_cells = []
+    for cell in _split_table_row(lines[1]):
+        if cell.startswith(':') and cell.endswith(':'):
+            align_cells.append('center')
+        elif cell.endswith(':'):
+            align_cells.append('right')
+        elif cell.startswith(':'):
+            align_cells.append('left')
+        else:
+            align_cells.append('')
+    styles = [f' style="text-align:{align}"' if align else '' for align in align_cells]
+
+    def style_at(i):
+        return styles[i] if i < len(styles) else ''
+
+    parts = ['<table class="table"><thead><tr>']
+    for i, cell in enumerate(header_cells):
+        parts.append(f'<th{style_at(i)}>{render_inline(cell)}</th>')
+    parts.append('</tr></thead><tbody>')
+    for line in lines[2:]:
+        parts.append('<tr>')
+        for i, cell in enumerate(_split_table_row(line)):
+            label = header_cells[i] if i < len(header_cells) else ''
+            parts.append(f'<td data-label="{label}"{style_at(i)}>{render_inline(cell)}</td>')
+        parts.append('</tr>')
+    parts.append('</tbody></table>')
+    return ''.join(parts)
+
+
+def render_markdown_nodes(nodes):
+    """将块级节点列表渲染为 HTML"""
+    out = []
+    append = out.append
+    for node in nodes:
+        kind = node[0]
+        if kind == 'para':
+            append(f'<p>{render_inline(node[1])}</p>')
+        elif kind == 'heading':
+            level, text = node[1], node[2]
+            anchor = text.replace('"', '&quot;')
+            append(f'<h{level} id="{anchor}">{render_inline(text)}</h{level}>')
+        elif kind == 'code':
+            append(CODE_BLOCK_HTML.format(lang=node[1], content=escape_html(node[2])))
+        elif kind == 'math':
+            append(f'<p class="math-block">{node[1]}</p>')
+        elif kind == 'list':
+            items = ''.join(f'<li>{render_inline(item)}</li>\n' for item in node[2])
+            append(f'<{node[1]}>{items}</{node[1]}>')
+        elif kind == 'quote':
+            lines = [render_inline(line) for line in node[1] if line]
+            append(f'<blockquote>{"<br>".join(lines)}</blockquote>')
+        elif kind == 'table':
+            append(render_table(node[1]))
+        elif kind == 'hr':
+            append('<hr>')
+        else:
+            append(node[1])
+    return '\n'.join(out)
+
+
+def convert_markdown_to_html_tokens(markdown_text):
+    """将 Markdown 转换为 HTML（单遍解析引擎：先切分为块级节点，再一次性渲染）
+
+    块级扫描器按 LF 分行（围栏结束行要求 ``` 之后只有空白直到行尾），先把 CRLF / CR 换行统一为 LF，
+    否则 Windows 换行的文档中围栏代码块无法闭合，后面的全文都会被当作代码。
+    """
+    if '\r' in markdown_text:
+        markdown_text = markdown_text.replace('\r\n', '\n').replace('\r', '\n')
+    return render_markdown_nodes(tokenize_markdown(markdown_text))
+
+
+MARKDOWN_ENGINES = {
+    'tokenizer': convert_markdown_to_html_tokens,
+    'regex': convert_markdown_to_html_regex,
+}
+
+
 def extract_title(markdown_text):
     """从 Markdown 中提取标题"""
-    match = re.search(r'^# (.+)$', markdown_text, re.MULTILINE)
+    match = RE_FIRST_HEADING.search(markdown_text)
     return match.group(1) if match else "无标题"
 
 
+def split_title(markdown_text):
+    """返回 (标题, 去掉第一个标题行的正文)，与先 extract_title 再删除标题行的结果一致，但只扫描一次"""
+    match = RE_FIRST_HEADING.search(markdown_text)
+    if not match:
+        return "无标题", markdown_text
+    return match.group(1), markdown_text[:match.start()] + markdown_text[match.end():]
+
+
 def extract_excerpt(markdown_text, max_length=100):
-    """从 Markdown 中提取摘要"""
+    """从 Markdown 中提取摘要
+
+    标题、代码块、链接等结构的移除需要看完整文本；之后逐字符的删除与空白折叠只影响局部，
+    因此只处理按需加长的前缀，得到超过 max_length 个字符即可，结果与处理全文一致。
+    """
     # 移除标题
-    text = re.sub(r'^# .+$', '', markdown_text, flags=re.MULTILINE)
+    text = RE_TITLE_LINE.sub('', markdown_text)
     # 移除代码块
-    text = re.sub(r'```.*?```', '', text, flags=re.DOTALL)
+    text = RE_EXCERPT_CODE_BLOCK.sub('', text)
     # 移除行内代码
-    text = re.sub(r'`[^`]+`', '', text)
+    text = RE_EXCERPT_INLINE_CODE.sub('', text)
     # 移除图片
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
+    text = RE_EXCERPT_IMAGE.sub('', text)
     # 移除链接
-    text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-    # 移除粗体斜体标记
-    text = re.sub(r'[*_]+', '', text)
-    # 移除特殊字符
-    text = re.sub(r'[^\w\s\u4e00-\u9fff]', '', text)
-    # 移除多余空白
-    text = re.sub(r'\s+', ' ', text).strip()
-
-    if len(text) > max_length:
-        return text[:max_length] + "..."
-    return text
+    text = RE_EXCERPT_LINK.sub(r'\1', text)
+
+    size = max_length * 4
+    while True:
+        # 移除粗体斜体标记
+        excerpt = RE_EXCERPT_EMPHASIS.sub('', text[:size])
+        # 移除特殊字符
+        excerpt = RE_EXCERPT_SPECIAL.sub('', excerpt)
+        # 移除多余空白
+        excerpt = RE_WHITESPACE.sub(' ', excerpt).strip()
+
+        if len(excerpt) > max_length:
+            return excerpt[:max_length] + "..."
+        if size >= len(text):
+            return excerpt
+        size *= 2
+
+
+def analyze_article(markdown_text, filename, engine=None, count_words=True):
+    """单篇文章的一次性分析：标题、摘要、日期、字数，传入 engine 时还有正文 HTML
+
+    标题只查找一次，去掉标题行的正文同时用于摘要、字数统计与转换。
+    process_category 只需要元数据（engine=None），正文由 render_article 在渲染进程中转换；
+    元数据按源文件内容哈希记录在构建清单中，内容未变化的文章不再分析。
+    字数只用于构建摘要，不写入页面；count_words=False 时跳过统计，字数记为 0。
+    """
+    title, body = split_title(markdown_text)
+    return {
+        'title': title,
+        'excerpt': extract_excerpt(body),
+        'date': get_date_from_filename(filename),
+        'words': len(RE_WORD_COUNT.findall(body)) if count_words else 0,
+        'html': convert_markdown_to_html(body, engine) if engine else None,
+    }
 
 
 def get_date_from_filename(filename):
-    """从文件名提取日期，格式: YYYY-MM-DD-title.md"""
-    match = re.match(r'^(\d{4}-\d{2}-\d{2})-.+\.md$', filename)
+    """从文件名提取日期，格式: YYYY-MM-DD-title.md
+
+    不存在的日期（例如 2026-02-30）与没有日期的文件名一样按今天处理，保证返回值总能转为 date_ordinal。
+    """
+    match = RE_DATED_FILENAME.match(filename)
     if match:
-        return match.group(1)
+        try:
+            datetime.fromisoformat(match.group(1))
+            return match.group(1)
+        except ValueError:
+            pass
     return datetime.now().strftime("%Y-%m-%d")
 
 
 # ============================================================
-# 主处理函数 - 按生成顺序: 文章 -> Category Index -> 首页
+# 源目录遍历 - 递归发现分类与子分类
 # ============================================================
 
-def process_category(category_dir, category_name, config, output_dir):
-    """处理单个 category 目录 - 生成文章"""
-    articles = []
+# 不进入的目录（此外以 . 开头的目录与输出目录也会跳过）
+SKIP_DIRS = frozenset(('__pycache__', 'node_modules'))
+
+
+def scan_files(path):
+    """返回目录下的文件 DirEntry 列表（按文件名排序）"""
+    with os.scandir(path) as entries:
+        return sorted((entry for entry in entries if entry.is_file()), key=lambda entry: entry.name)
+
+
+def walk_categories(docs_dir, output_dir=None):
+    """用 os.scandir 递归遍历 docs_dir，按路径先序产出 (分类相对路径, [文件 DirEntry])
+
+    每个目录只 scandir 一次，文件与目录的区分直接使用目录项自带的类型（is_dir / is_file 不再 stat）。
+    隐藏目录（.git、.github 等）、SKIP_DIRS 与输出目录在进入之前剪枝；
+    符号链接目录只在首次遇到其真实路径时进入，避免循环。docs_dir 自身的文件不属于任何分类。
+    """
+    output_dir = os.path.realpath(OUTPUT_DIR if output_dir is None else output_dir)
+    output_name = os.path.basename(output_dir)
+    visited = set()
+    stack = [('', os.fspath(docs_dir))]
+    while stack:
+        category_name, path = stack.pop()
+        files = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if entry.name.startswith('.') or entry.name in SKIP_DIRS:
+                        continue
+                    if entry.is_symlink():
+                        real_path = os.path.realpath(entry.path)
+                        if real_path in visited:
+                            continue
+                        visited.add(real_path)
+                    subdirs.append(entry)
+                elif entry.is_file():
+                    files.append(entry)
+        if category_name:
+            files.sort(key=lambda entry: entry.name)
+            yield category_name, files
+        for entry in sorted(subdirs, key=lambda entry: entry.name, reverse=True):
+            # 输出目录通常位于 docs_dir 之下：只对与它同名的目录比较真实路径
+            if entry.name == output_name and os.path.realpath(entry.path) == output_dir:
+                continue
+            stack.append((f"{category_name}/{entry.name}" if category_name else entry.name, entry.path))
+
+
+def category_index_articles(articles_by_category):
+    """各分类索引页列出的文章：本分类及其全部子分类的文章，按日期倒序
+
+    articles_by_category 为 {分类相对路径: 按 ArticleTable.by_date 排序的文章列表}，
+    返回 {分类相对路径: 文章列表}，只有子分类的上级目录也包含在内。
+    没有子分类文章的分类原样使用本分类的列表；合并后按 (日期, 文件名) 倒序，结果与遍历顺序无关。
+    """
+    nested = defaultdict(list)
+    for category_name, articles in articles_by_category.items():
+        if not articles:
+            continue
+        parent = category_name
+        while '/' in parent:
+            parent = parent.rpartition('/')[0]
+            nested[parent].append(category_name)
+
+    result = {}
+    for category_name in articles_by_category.keys() | nested.keys():
+        articles = list(articles_by_category.get(category_name, ()))
+        if category_name in nested:
+            for name in nested[category_name]:
+                articles.extend(articles_by_category[name])
+            articles.sort(key=lambda article: (article.ordinal, article.filename), reverse=True)
+        if articles:
+            result[category_name] = articles
+    return result
 
-    # 创建输出子目录（保持目录结构）
-    output_subdir = Path(output_dir) / category_dir.name
-    output_subdir.mkdir(parents=True, exist_ok=True)
 
-    # 获取目录下的所有文件
-    all_files = list(category_dir.iterdir())
+# ============================================================
+# 文章记录与全站文章索引 - 按日期合并各分类的文章（首页最近更新、归档页）
+# ============================================================
 
-    # 处理 md 文件
-    md_files = sorted([f for f in all_files if f.suffix == '.md'], key=lambda x: x.name, reverse=True)
+ARCHIVE_DIR = "archive"
 
-    # 复制非 md 文件（如图片）
-    for file in all_files:
-        if file.is_file() and file.suffix != '.md':
-            dest = output_subdir / file.name
-            shutil.copy2(file, dest)
-            print(f"  + {file.name} (copied)")
 
-    for md_file in md_files:
-        # 读取 md 文件
-        with open(md_file, 'r', encoding='utf-8') as f:
-            content = f.read()
+def date_ordinal(date):
+    """YYYY-MM-DD 转为 datetime.toordinal() 整数"""
+    return datetime.fromisoformat(date).toordinal()
 
-        # 提取标题
-        title = extract_title(content)
 
-        # 提取日期
-        date = get_date_from_filename(md_file.name)
+class Article:
+    """一篇文章的索引信息：分类索引页、首页最近更新、归档页、sitemap 与 Atom feed 共用
 
-        # 生成 HTML 文件名（放在子目录中）
-        html_filename = md_file.stem + ".html"
-        output_path = output_subdir / html_filename
-
-        # 转换内容（跳过第一个标题，因为它会作为页面标题显示）
-        content_without_title = re.sub(r'^# .+$', '', content, count=1, flags=re.MULTILINE)
-        html_content = convert_markdown_to_html(content_without_title)
-
-        # 查找上一讲和下一篇文章（不带 .html 后缀，因为在同一目录）
-        idx = md_files.index(md_file)
-        prev_link = ""
-        next_link = ""
-        if idx < len(md_files) - 1:
-            next_link = md_files[idx + 1].stem
-        if idx > 0:
-            prev_link = md_files[idx - 1].stem
-        if not prev_link:
-            prev_link = "#"
-        if not next_link:
-            next_link = "#"
-
-        # ========== 步骤 1: 生成文章页面 ==========
-        # 使用模块化模板生成文章
-        relative_path = f"{category_dir.name}/"
-        html = build_article_html(
-            config=config,
-            title=title,
-            date=date,
-            category=category_name,
-            content=html_content,
-            prev_link=prev_link,
-            next_link=next_link,
-            relative_path=relative_path
+    整个构建期间全站文章都留在内存中，因此用 __slots__ 代替 dict（没有实例 __dict__，见 bench.py memory）。
+    日期保存为 toordinal() 整数，排序与归并只比较整数，显示时再格式化为 YYYY-MM-DD；
+    同一分类的文章共享同一个分类路径字符串，filename（分类/slug.html）按需拼出。
+    """
+
+    __slots__ = ('title', 'ordinal', 'category', 'slug', 'excerpt', 'words')
+
+    def __init__(self, title, date, category, slug, excerpt='', words=0):
+        self.title = title
+        self.ordinal = date_ordinal(date)
+        self.category = category
+        self.slug = slug
+        self.excerpt = excerpt
+        self.words = words
+
+    @property
+    def date(self):
+        return datetime.fromordinal(self.ordinal).date().isoformat()
+
+    @property
+    def name(self):
+        """源文件名（slug.md）"""
+        return f"{self.slug}.md"
+
+    @property
+    def filename(self):
+        """相对输出目录的页面路径"""
+        return f"{self.category}/{self.slug}.html"
+
+    def fields(self):
+        """可 JSON 序列化的全部字段，用于页面输入摘要"""
+        return [self.title, self.date, self.category, self.slug, self.excerpt, self.words]
+
+    def __repr__(self):
+        return f"Article({self.filename!r}, {self.date!r}, {self.title!r})"
+
+
+class ArticleIndex:
+    """全站文章索引：{分类相对路径: 该分类的 Article 列表}
+
+    各分类的列表直接使用 process_category 的返回值（日期倒序），不复制、也不合并成一个大列表重新排序：
+    recent(n) 用堆按日期多路归并，只取前 n 篇，额外内存与分类数成正比；
+    归档页、sitemap 与摘要直接消费同一个惰性归并迭代器。同一天的文章按分类路径排序，结果与登记顺序无关。
+    """
+
+    def __init__(self):
+        self.categories = {}
+
+    def add_category(self, category_name, articles):
+        """登记一个分类的文章（process_category 的返回值，已按日期倒序）"""
+        self.categories[category_name] = articles
+
+    def __len__(self):
+        return sum(len(articles) for articles in self.categories.values())
+
+    def iter_by_date(self):
+        """按日期倒序惰性产出全站文章"""
+        lists = [self.categories[name] for name in sorted(self.categories)]
+        return heapq.merge(*lists, key=attrgetter('ordinal'), reverse=True)
+
+    def recent(self, n):
+        """最新的 n 篇文章"""
+        if n <= 0:
+            return []
+        return list(islice(self.iter_by_date(), n))
+
+    def digest(self):
+        """全部文章（按归档顺序）的日期、路径与标题的摘要，用于判断归档页是否需要重建；逐篇计算，不生成中间列表"""
+        h = hashlib.sha256()
+        for article in self.iter_by_date():
+            for part in (str(article.ordinal), article.category, article.slug, article.title):
+                h.update(part.encode('utf-8'))
+                h.update(b'\0')
+        return h.hexdigest()
+
+
+# ============================================================
+# 站点地图与订阅 - 流式写出 sitemap.xml 与 Atom feed
+# ============================================================
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "atom.xml"
+# 单个 sitemap 文件的 URL 上限（sitemaps.org 协议），超过时拆分为 sitemap-N.xml 并由 sitemap.xml 索引
+SITEMAP_MAX_URLS = 50000
+
+SITEMAP_URLSET_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+"""
+SITEMAP_URL = """  <url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>
+"""
+SITEMAP_URLSET_TAIL = """</urlset>
+"""
+SITEMAP_INDEX_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+"""
+SITEMAP_INDEX_ENTRY = """  <sitemap><loc>{loc}</loc></sitemap>
+"""
+SITEMAP_INDEX_TAIL = """</sitemapindex>
+"""
+
+FEED_HEAD = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>{title}</title>
+  <subtitle>{subtitle}</subtitle>
+  <link href="{base_url}/{feed_name}" rel="self" type="application/atom+xml"/>
+  <link href="{base_url}/" rel="alternate" type="text/html"/>
+  <id>{base_url}/</id>
+  <updated>{updated}</updated>
+  <author><name>{author}</name></author>
+"""
+FEED_ENTRY = """  <entry>
+    <title>{title}</title>
+    <link href="{link}" rel="alternate" type="text/html"/>
+    <id>{link}</id>
+    <updated>{updated}</updated>
+    <category term="{category}" label="{label}"/>
+    <summary>{summary}</summary>
+  </entry>
+"""
+FEED_TAIL = """</feed>
+"""
+
+
+def escape_xml(text):
+    """转义 XML 文本与属性值中的特殊字符"""
+    return escape_html(str(text)).replace('"', '&quot;')
+
+
+def site_url(config):
+    """站点根地址（去掉末尾的 /）；未配置时为空字符串"""
+    return config.get('site', {}).get('url', '').rstrip('/')
+
+
+def output_enabled(config, key):
+    """sitemap / feed 是否启用：显式的 true / false 优先，未设置（None）时取决于是否配置了 site.url"""
+    enabled = config.get(key, {}).get('enabled')
+    return bool(site_url(config)) if enabled is None else bool(enabled)
+
+
+def sitemap_enabled(config):
+    return output_enabled(config, 'sitemap')
+
+
+def feed_count(config):
+    """Atom feed 的文章数；未启用时为 0"""
+    return config.get('feed', {}).get('count', 20) if output_enabled(config, 'feed') else 0
+
+
+def atom_timestamp(date):
+    """get_date_from_filename 的 YYYY-MM-DD 转为 Atom / W3C 时间戳"""
+    return f"{date}T00:00:00Z"
+
+
+def category_page_count(config, article_count):
+    per_page = articles_per_page(config)
+    if not per_page or per_page <= 0:
+        return 1
+    return max(1, -(-article_count // per_page))
+
+
+def sitemap_url_count(config, category_summaries, article_index):
+    """iter_sitemap_urls 产出的 URL 数（不遍历文章），用于预先决定是否拆分"""
+    pages = sum(category_page_count(config, count) for _, count in category_summaries.values())
+    return 1 + bool(archive_enabled(config)) + pages + len(article_index)
+
+
+def iter_sitemap_urls(config, category_summaries, article_index):
+    """按顺序产出 (loc, lastmod)：首页、归档页、各分类索引页（含分页）、全部文章（日期倒序）
+
+    category_summaries 为 {分类相对路径: (最新文章日期, 文章数)}，文章数包含子分类；
+    文章直接取自 article_index 的惰性归并，不生成全站 URL 列表。
+    """
+    base_url = site_url(config)
+    newest = max((date for date, _ in category_summaries.values()), default=get_date_from_filename(''))
+    yield f"{base_url}/", newest
+    if archive_enabled(config):
+        yield f"{base_url}/{ARCHIVE_DIR}/", newest
+    for category_name in sorted(category_summaries):
+        date, count = category_summaries[category_name]
+        for page in range(1, category_page_count(config, count) + 1):
+            suffix = '' if page == 1 else f"page/{page}/"
+            yield f"{base_url}/{category_name}/{suffix}", date
+    for article in article_index.iter_by_date():
+        yield f"{base_url}/{article.category}/{article.slug}", article.date
+
+
+def iter_urlset(urls):
+    yield SITEMAP_URLSET_HEAD
+    for loc, lastmod in urls:
+        yield SITEMAP_URL.format(loc=escape_xml(loc), lastmod=lastmod)
+    yield SITEMAP_URLSET_TAIL
+
+
+def sitemap_file_names(url_count, max_urls=SITEMAP_MAX_URLS):
+    """sitemap 文件名：不超过 max_urls 条时只有 sitemap.xml，否则为 sitemap.xml 索引加 sitemap-N.xml 分片"""
+    if url_count <= max_urls:
+        return [SITEMAP_NAME]
+    parts = -(-url_count // max_urls)
+    return [SITEMAP_NAME] + [f"sitemap-{part}.xml" for part in range(1, parts + 1)]
+
+
+def iter_sitemap_files(config, urls, url_count, max_urls=SITEMAP_MAX_URLS):
+    """按顺序产出 (文件名, 片段迭代器)；调用方需在取下一个文件之前写完当前文件的全部片段
+
+    各分片从同一个 URL 迭代器中依次截取 max_urls 条，全程不保存 URL 列表。
+    """
+    names = sitemap_file_names(url_count, max_urls)
+    if len(names) == 1:
+        yield SITEMAP_NAME, iter_urlset(urls)
+        return
+    urls = iter(urls)
+    for name in names[1:]:
+        yield name, iter_urlset(islice(urls, max_urls))
+    base_url = site_url(config)
+    yield SITEMAP_NAME, [SITEMAP_INDEX_HEAD] + [
+        SITEMAP_INDEX_ENTRY.format(loc=escape_xml(f"{base_url}/{name}")) for name in names[1:]
+    ] + [SITEMAP_INDEX_TAIL]
+
+
+def iter_feed_xml(config, articles):
+    """按顺序产出 Atom feed 片段；articles 为按日期倒序的最新文章（ArticleIndex.recent）"""
+    site = config.get('site', {})
+    base_url = site_url(config)
+    names = category_names(config)
+    updated = atom_timestamp(articles[0].date if articles else get_date_from_filename(''))
+    yield FEED_HEAD.format(
+        title=escape_xml(site.get('title', '')),
+        subtitle=escape_xml(site.get('subtitle', '')),
+        base_url=escape_xml(base_url),
+        feed_name=FEED_NAME,
+        updated=updated,
+        author=escape_xml(site.get('author', ''))
+    )
+    for article in articles:
+        yield FEED_ENTRY.format(
+            title=escape_xml(article.title),
+            link=escape_xml(f"{base_url}/{article.category}/{article.slug}"),
+            updated=atom_timestamp(article.date),
+            category=escape_xml(article.category),
+            label=escape_xml(category_display_name(article.category, names)),
+            summary=escape_xml(article.excerpt)
         )
+    yield FEED_TAIL
+
+
+# ============================================================
+# 增量构建 - 基于内容哈希的构建清单
+# ============================================================
+
+def hash_text(*parts):
+    """计算若干字符串片段的 SHA-256 摘要"""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(str(part).encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def hash_config(config):
+    """计算配置的哈希（键排序，与 dict 顺序无关）"""
+    return hash_text(json.dumps(config, sort_keys=True, ensure_ascii=False, default=str))
+
+
+# ---------- 依赖图：每种页面读取哪些配置键与模板常量 ----------
+
+# 各类页面使用的模板常量（修改模板时只重建用到它的页面）
+PAGE_TEMPLATES = {
+    'article': ("HTML_HEAD", "HTML_NAV", "HTML_FOOTER", "HTML_BASE_SCRIPTS",
+                "ARTICLE_EXTRA_HEAD", "ARTICLE_CONTENT", "CODE_BLOCK_HTML"),
+    'category': ("HTML_HEAD", "HTML_NAV", "HTML_FOOTER", "HTML_BASE_SCRIPTS",
+                 "CATEGORY_HEADER", "CATEGORY_CONTENT", "ARTICLE_CARD",
+                 "CATEGORY_PAGINATION", "PAGINATION_LINK", "PAGINATION_DISABLED"),
+    'index': ("HTML_HEAD", "HTML_NAV", "HTML_FOOTER", "HTML_BASE_SCRIPTS", "HERO_SECTION",
+              "CATEGORY_CARD", "SOCIAL_BUTTON", "SOCIAL_ICONS", "RECENT_POSTS", "RECENT_MORE_LINK",
+              "POST_LIST_ITEM"),
+    'archive': ("HTML_HEAD", "HTML_NAV", "HTML_FOOTER", "HTML_BASE_SCRIPTS", "CATEGORY_HEADER",
+                "ARCHIVE_CONTENT", "ARCHIVE_YEAR_HEAD", "ARCHIVE_YEAR_TAIL", "POST_LIST_ITEM"),
+    'sitemap': ("SITEMAP_URLSET_HEAD", "SITEMAP_URL", "SITEMAP_URLSET_TAIL",
+                "SITEMAP_INDEX_HEAD", "SITEMAP_INDEX_ENTRY", "SITEMAP_INDEX_TAIL"),
+    'feed': ("FEED_HEAD", "FEED_ENTRY", "FEED_TAIL"),
+    'search': (),
+    'search-shard': (),
+}
 
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+PAGE_KIND_NAMES = {
+    'article': "文章页",
+    'category': "分类索引页",
+    'index': "首页",
+    'archive': "归档页",
+    'sitemap': "站点地图",
+    'feed': "Atom feed",
+    'search': "搜索索引",
+    'search-shard': "搜索索引分片",
+}
+
+# 配置中不存在的键的占位值（键被新增时依赖随之变化）
+MISSING_CONFIG_VALUE = "<missing>"
 
-        print(f"  ✓ {category_dir.name}/{html_filename}")
 
-        # 提取摘要用于列表页
-        excerpt = extract_excerpt(content)
+class ConfigReadTracker(dict):
+    """记录被读取的配置键（点分路径，例如 hero.bio）的配置副本
 
-        articles.append({
-            'title': title,
-            'date': date,
-            'filename': f"{category_dir.name}/{html_filename}",
-            'excerpt': excerpt,
-            'tag': category_name
+    嵌套 dict 返回同样记录读取的子副本，因此只记录实际用到的叶子键；
+    读取不存在的键、遍历整个 dict 时记录该 dict 自身的路径。
+    """
+
+    def __init__(self, data, reads, prefix=''):
+        super().__init__(data)
+        self.reads = reads
+        self.prefix = prefix
+
+    def _path(self, key=None):
+        return self.prefix + str(key) if key is not None else self.prefix.rstrip('.')
+
+    def _wrap(self, key, value):
+        if isinstance(value, dict):
+            return ConfigReadTracker(value, self.reads, self._path(key) + '.')
+        self.reads.add(self._path(key))
+        return value
+
+    def __getitem__(self, key):
+        if not dict.__contains__(self, key):
+            self.reads.add(self._path(key))
+        return self._wrap(key, dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        if not dict.__contains__(self, key):
+            self.reads.add(self._path(key))
+            return default
+        return self._wrap(key, dict.__getitem__(self, key))
+
+    def __contains__(self, key):
+        self.reads.add(self._path(key))
+        return dict.__contains__(self, key)
+
+    def _read_all(self):
+        self.reads.add(self._path())
+
+    def __iter__(self):
+        self._read_all()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self._read_all()
+        return dict.__len__(self)
+
+    def keys(self):
+        self._read_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._read_all()
+        return dict.values(self)
+
+    def items(self):
+        self._read_all()
+        return dict.items(self)
+
+
+def markdown_engine(config):
+    return config.get('markdown', {}).get('engine', DEFAULT_MARKDOWN_ENGINE)
+
+
+def articles_per_page(config):
+    return config.get('pagination', {}).get('per_page', 0)
+
+
+def recent_count(config):
+    return config.get('recent', {}).get('count', 0)
+
+
+def archive_enabled(config):
+    return config.get('archive', {}).get('enabled', False)
+
+
+def trace_config_reads(kind, config):
+    """用示例数据渲染一个 kind 类型的页面，返回渲染过程中读取的配置键
+
+    与真实页面走同一套组装函数（不使用 PageChrome 缓存），因此模板函数新增的配置读取会自动进入依赖图。
+    """
+    reads = set()
+    tracked = ConfigReadTracker(config, reads)
+    chrome = PageChrome(tracked, config_hash='trace')
+    article = Article('title', '2000-01-01', 'category', 'title')
+    if kind == 'article':
+        markdown_engine(tracked)
+        fragments = iter_article_html(tracked, 'title', '2000-01-01', 'category', '<p></p>', '#', '#', chrome=chrome)
+    elif kind == 'category':
+        articles_per_page(tracked)
+        fragments = iter_category_index_html(tracked, 'category', 'category', [article], chrome=chrome,
+                                             page=2, page_count=3)
+    elif kind == 'index':
+        fragments = iter_index_html(tracked, [{'name': 'category', 'display_name': 'category', 'count': 1}], chrome,
+                                    recent=[article][:recent_count(tracked)])
+    elif kind == 'archive':
+        archive_enabled(tracked)
+        fragments = iter_archive_html(tracked, [article], 1, chrome)
+    elif kind == 'sitemap':
+        # XML 不经过 finish_page（不受 minify 影响）
+        article_index = ArticleIndex()
+        article_index.add_category('category', [article])
+        summaries = {'category': ('2000-01-01', 1)}
+        sitemap_enabled(tracked)
+        urls = iter_sitemap_urls(tracked, summaries, article_index)
+        for _, fragments in iter_sitemap_files(tracked, urls, sitemap_url_count(tracked, summaries, article_index)):
+            list(fragments)
+        return reads
+    elif kind == 'feed':
+        feed_count(tracked)
+        list(iter_feed_xml(tracked, [article]))
+        return reads
+    else:
+        return set()
+    # 丢弃结果与计时（finish_page 会统计精简字节数）
+    list(finish_page(tracked, fragments, timer=StageTimer()))
+    return reads
+
+
+def resolve_config_path(config, path):
+    """按点分路径取配置值；不存在时返回 MISSING_CONFIG_VALUE"""
+    value = config
+    for part in path.split('.') if path else ():
+        if not isinstance(value, dict) or part not in value:
+            return MISSING_CONFIG_VALUE
+        value = value[part]
+    return value
+
+
+def page_dependency_graph(config):
+    """返回 ({页面类型: [依赖名]}, {依赖名: 值哈希})
+
+    依赖名为 config:<点分路径> 或 template:<模板常量名>。
+    """
+    module_globals = globals()
+    graph = {}
+    hashes = {}
+    for kind, template_names in PAGE_TEMPLATES.items():
+        deps = []
+        for path in sorted(trace_config_reads(kind, config)):
+            dep = f"config:{path}"
+            hashes[dep] = hash_config(resolve_config_path(config, path))
+            deps.append(dep)
+        for name in template_names:
+            dep = f"template:{name}"
+            hashes[dep] = hash_text(module_globals[name])
+            deps.append(dep)
+        graph[kind] = deps
+    return graph, hashes
+
+
+class BuildManifest:
+    """增量构建清单
+
+    记录每个源文件的内容哈希（及提取出的标题、摘要）和每个输出页面的输入摘要。
+    页面摘要只包含该类页面依赖的配置键与模板常量（见 page_dependency_graph），
+    例如修改 hero.bio 只重建首页，修改 nav_menu 或 footer 则重建所有页面。
+    依赖图与各依赖的值哈希随清单保存，用于报告本次哪些依赖发生了变化。
+    """
+
+    def __init__(self, path, config, previous=None):
+        self.path = Path(path)
+        self.config_hash = hash_config(config)
+        self.dependencies, self.dependency_hashes = page_dependency_graph(config)
+        self.kind_hashes = {
+            kind: hash_text(CONVERTER_VERSION, kind, *(f"{dep}={self.dependency_hashes[dep]}" for dep in deps))
+            for kind, deps in self.dependencies.items()
+        }
+        previous = previous or {}
+        self._old_dependency_hashes = previous.get('dependency_hashes')
+        self._old_sources = previous.get('sources', {})
+        self._old_pages = previous.get('pages', {})
+        self.sources = {}
+        self.pages = {}
+        self.skipped = 0
+        self.written = 0
+        # 输出目录中 .gz / .br 压缩副本对应的源文件摘要 {相对路径: 摘要}（见 compress_output）
+        compressed = previous.get('compressed')
+        # 旧版清单只记录了布尔值：True 时副本可能存在但无法确认是否最新（None，按全部过期处理）
+        self.compressed = compressed if isinstance(compressed, dict) else (None if compressed else {})
+
+    @classmethod
+    def load(cls, output_dir, config, force=False):
+        """读取上次构建的清单；force=True 时忽略旧清单（全量重建）"""
+        path = Path(output_dir) / BUILD_MANIFEST_NAME
+        previous = None
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    previous = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"[警告] 读取构建清单失败，将全量重建: {e}")
+        if force and previous:
+            # 全量重建丢弃全部页面摘要（每个页面都重新生成），但保留旧页面列表，
+            # 以便删除源文件已删除的页面；也要知道输出目录中旧压缩副本对应的内容
+            previous = {'pages': dict.fromkeys(previous.get('pages', {})), 'compressed': previous.get('compressed')}
+        return cls(path, config, previous)
+
+    def page_digest(self, kind, *inputs):
+        """计算页面的输入摘要：kind 类页面的依赖哈希加上页面自身的输入"""
+        return hash_text(self.kind_hashes[kind], *inputs)
+
+    def changed_dependencies(self):
+        """返回 {页面类型: [变化的依赖名]}，只包含有依赖变化的类型；没有旧清单时返回 {}"""
+        old = self._old_dependency_hashes
+        if old is None:
+            return {}
+        changed = {}
+        for kind, deps in self.dependencies.items():
+            names = [dep for dep in deps if old.get(dep) != self.dependency_hashes[dep]]
+            if names:
+                changed[kind] = names
+        return changed
+
+    def lookup_source(self, rel_path, content_hash):
+        """返回内容未变化的源文件上次记录的元数据，否则返回 None"""
+        entry = self._old_sources.get(rel_path)
+        if entry and entry.get('hash') == content_hash:
+            return entry
+        return None
+
+    def previous_source(self, rel_path):
+        """返回上次构建记录的源文件元数据（不校验内容哈希）"""
+        return self._old_sources.get(rel_path)
+
+    def record_source(self, rel_path, content_hash, article):
+        """记录源文件的内容哈希与文章元数据；直接引用 Article，保存清单时才展开为 dict"""
+        self.sources[rel_path] = (content_hash, article)
+
+    def is_unchanged(self, page_path, digest):
+        """页面输入未变化且输出文件仍存在时返回 True（不记录到新清单）"""
+        rel_path = Path(page_path).relative_to(self.path.parent).as_posix()
+        return self._old_pages.get(rel_path) == digest and Path(page_path).exists()
+
+    def is_current(self, page_path, digest):
+        """页面输入未变化且输出文件仍存在时返回 True，并记录到新清单"""
+        rel_path = Path(page_path).relative_to(self.path.parent).as_posix()
+        self.pages[rel_path] = digest
+        if self.is_unchanged(page_path, digest):
+            self.skipped += 1
+            return True
+        self.written += 1
+        return False
+
+    def remove_stale_pages(self):
+        """删除上次生成、本次已不再生成的页面（例如源文件被删除）"""
+        removed = []
+        for rel_path in self._old_pages.keys() - self.pages.keys():
+            stale = self.path.parent / rel_path
+            if stale.exists():
+                stale.unlink()
+                removed.append(rel_path)
+                for encoding in ('gz', 'br'):
+                    Path(f"{stale}.{encoding}").unlink(missing_ok=True)
+                # 分页减少后 page/N/ 目录随之清空，一并删除
+                parent = stale.parent
+                while parent != self.path.parent and not any(parent.iterdir()):
+                    parent.rmdir()
+                    parent = parent.parent
+        return sorted(removed)
+
+    def save(self):
+        """原子地写入新清单"""
+        self._write(self.path, {
+            'converter_version': CONVERTER_VERSION,
+            'config_hash': self.config_hash,
+            'dependencies': self.dependencies,
+            'dependency_hashes': self.dependency_hashes,
+            'sources': {
+                rel_path: {'title': article.title, 'excerpt': article.excerpt, 'words': article.words,
+                           'hash': content_hash}
+                for rel_path, (content_hash, article) in self.sources.items()
+            },
+            'pages': self.pages,
+            'compressed': self.compressed,
         })
 
-    return articles
+    @classmethod
+    def invalidate_pages(cls, output_dir, page_paths):
+        """从已保存的清单中移除指定页面，使下次构建重新生成它们
+
+        用于在清单之外写入页面的场景（例如 serve.py 的单文件重建）。
+        """
+        def update(pages):
+            for page_path in page_paths:
+                pages.pop(Path(page_path).relative_to(output_dir).as_posix(), None)
+        cls._update_saved_pages(output_dir, update)
+
+    @classmethod
+    def record_pages(cls, output_dir, digests):
+        """把 {相对输出目录的路径: 输入摘要} 写入已保存的清单
+
+        用于在清单之外写入、但输入摘要与 convert.py 的计算方式相同的页面（例如 serve.py 重建的搜索索引）。
+        """
+        cls._update_saved_pages(output_dir, lambda pages: pages.update(digests))
+
+    @classmethod
+    def _update_saved_pages(cls, output_dir, update):
+        path = Path(output_dir) / BUILD_MANIFEST_NAME
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        update(data.setdefault('pages', {}))
+        cls._write(path, data)
+
+    @classmethod
+    def _write(cls, path, data):
+        cls._write_text(path, json.dumps(data, ensure_ascii=False, sort_keys=True))
+
+    @staticmethod
+    def _write_text(path, text):
+        """先写临时文件再替换，中断时不会留下半个文件"""
+        tmp_path = path.with_name(path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+# ============================================================
+# 渲染缓存 - 内容寻址，可在多次构建（CI 运行）之间共享
+# ============================================================
+
+# 缓存目录（未设置时不使用缓存）；CI 中用 actions/cache 保存并恢复该目录，见 action.yml
+RENDER_CACHE_ENV = "MD2HTML_CACHE_DIR"
+# 缓存大小上限（MB），超出后按最近使用时间淘汰
+RENDER_CACHE_SIZE_ENV = "MD2HTML_CACHE_MAX_MB"
+RENDER_CACHE_DEFAULT_MB = 256
+
+
+class RenderCache:
+    """内容寻址的文章渲染缓存
+
+    键为 hash(转换器版本, Markdown 引擎, 源文件内容)，条目保存正文 HTML（套用页面模板之前）
+    与标题、摘要、字数。这些结果与配置、模板、文件名和输出目录都无关，
+    因此干净检出的 CI 构建也能复用之前任意一次构建（任意分支）的结果。
+
+    条目是 <缓存目录>/<键前两位>/<键>.json，先写临时文件再替换，进程池中的渲染进程可同时写入。
+    文件 mtime 即最近使用时间：命中时更新，prune() 从最久未使用的条目开始删除直到不超过上限。
+    """
+
+    def __init__(self, path, max_bytes=RENDER_CACHE_DEFAULT_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_env(cls, path=None, max_mb=None):
+        """按参数或环境变量创建缓存；没有指定缓存目录时返回 None"""
+        path = path or os.environ.get(RENDER_CACHE_ENV)
+        if not path:
+            return None
+        if max_mb is None:
+            max_mb = float(os.environ.get(RENDER_CACHE_SIZE_ENV) or RENDER_CACHE_DEFAULT_MB)
+        return cls(path, int(max_mb * 1024 * 1024))
+
+    @staticmethod
+    def key(markdown_text, engine):
+        return hash_text(CONVERTER_VERSION, engine, markdown_text)
+
+    def _entry_path(self, key):
+        return self.path / key[:2] / f"{key}.json"
+
+    def get(self, key):
+        """返回缓存的 {'title', 'excerpt', 'words', 'html'}，未命中时返回 None"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        try:
+            os.utime(path)  # 标记为最近使用
+        except OSError:
+            pass
+        return entry
+
+    def put(self, key, entry):
+        """写入一个条目；缓存目录不可写时静默放弃（缓存只影响速度）"""
+        path = self._entry_path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            return False
+        return True
+
+    def prune(self):
+        """按 LRU 淘汰条目直到总大小不超过 max_bytes，返回 {'entries', 'bytes', 'evicted', 'evicted_bytes'}"""
+        entries = []
+        total = 0
+        try:
+            shards = [entry for entry in os.scandir(self.path) if entry.is_dir()]
+        except OSError:
+            shards = []
+        for shard in shards:
+            with os.scandir(shard.path) as files:
+                for file in files:
+                    if file.name.endswith('.json'):
+                        stat = file.stat()
+                        entries.append((stat.st_mtime_ns, stat.st_size, file.path))
+                        total += stat.st_size
+        stats = {'entries': len(entries), 'bytes': total, 'evicted': 0, 'evicted_bytes': 0}
+        if total <= self.max_bytes:
+            return stats
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+            stats['evicted'] += 1
+            stats['evicted_bytes'] += size
+        stats['entries'] -= stats['evicted']
+        stats['bytes'] = total
+        return stats
+
+
+def render_cache_summary(counters, prune_stats=None):
+    """渲染缓存的单行摘要：命中 / 未命中 / 写入，以及淘汰后的缓存大小"""
+    hits = counters.get('render_cache_hit', 0)
+    misses = counters.get('render_cache_miss', 0)
+    lookups = hits + misses
+    summary = f"命中 {hits}，未命中 {misses}"
+    if lookups:
+        summary += f"（命中率 {hits / lookups:.1%}）"
+    summary += f"，写入 {counters.get('render_cache_store', 0)}"
+    if prune_stats:
+        summary += f"，共 {prune_stats['entries']} 个条目 {format_bytes(prune_stats['bytes'])}"
+        if prune_stats['evicted']:
+            summary += f"（淘汰 {prune_stats['evicted']} 个 {format_bytes(prune_stats['evicted_bytes'])}）"
+    return summary
+
+
+# ============================================================
+# 构建计时 - 按阶段累计耗时与调用次数
+# ============================================================
+
+class StageTimer:
+    """按阶段（read / extract / convert / template / write / copy / index）累计耗时
+
+    同时按文章累计各阶段耗时；tracing=True 时额外记录 Chrome trace event，
+    可在 chrome://tracing 或 Perfetto 中查看。
+    """
+
+    def __init__(self, tracing=False, tid=0):
+        self.tracing = tracing
+        self.tid = tid
+        self.seconds = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.articles = defaultdict(lambda: defaultdict(float))
+        self.counters = defaultdict(int)
+        self.events = []
+
+    def count(self, name, value=1):
+        """累加计数器（例如精简前后的字节数）"""
+        self.counters[name] += value
+
+    @contextmanager
+    def stage(self, name, article=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[name] += elapsed
+            self.calls[name] += 1
+            if article is not None:
+                self.articles[article][name] += elapsed
+            if self.tracing:
+                event = {
+                    'name': name, 'cat': 'stage', 'ph': 'X',
+                    'ts': round(start * 1e6, 1), 'dur': round(elapsed * 1e6, 1),
+                    'pid': os.getpid(), 'tid': self.tid,
+                }
+                if article is not None:
+                    event['args'] = {'article': article}
+                self.events.append(event)
+
+    def snapshot(self):
+        """返回可序列化（可跨进程传递）的统计结果"""
+        return {
+            'stages': {name: [self.seconds[name], self.calls[name]] for name in self.seconds},
+            'articles': {article: dict(stages) for article, stages in self.articles.items()},
+            'counters': dict(self.counters),
+            'events': self.events,
+        }
+
+    def merge(self, snapshot):
+        """合并另一个计时器（例如进程池子进程）的 snapshot()"""
+        for name, (seconds, calls) in snapshot['stages'].items():
+            self.seconds[name] += seconds
+            self.calls[name] += calls
+        for article, stages in snapshot['articles'].items():
+            for name, seconds in stages.items():
+                self.articles[article][name] += seconds
+        for name, value in snapshot.get('counters', {}).items():
+            self.counters[name] += value
+        if self.tracing:
+            self.events.extend(snapshot['events'])
+
+    def reset(self, tracing=False):
+        self.tracing = tracing
+        self.seconds.clear()
+        self.calls.clear()
+        self.articles.clear()
+        self.counters.clear()
+        self.events = []
+
+    def slowest_articles(self, top=10):
+        """按各阶段总耗时排序的最慢文章"""
+        totals = sorted(
+            ((sum(stages.values()), article) for article, stages in self.articles.items()),
+            reverse=True
+        )
+        return [
+            {'article': article, 'seconds': round(total, 6),
+             'stages': {name: round(seconds, 6) for name, seconds in sorted(self.articles[article].items())}}
+            for total, article in totals[:top]
+        ]
+
+    def report(self, wall_seconds, top=10):
+        """生成机器可读的构建报告"""
+        return {
+            'wall_seconds': round(wall_seconds, 6),
+            'articles': len(self.articles),
+            'stages': {
+                name: {'seconds': round(self.seconds[name], 6), 'calls': self.calls[name]}
+                for name in sorted(self.seconds)
+            },
+            'counters': dict(sorted(self.counters.items())),
+            'slowest_articles': self.slowest_articles(top),
+        }
+
+    def write_report(self, path, wall_seconds, top=10):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(wall_seconds, top), f, ensure_ascii=False, indent=2)
+
+    def write_trace(self, path):
+        """写出 Chrome trace event 格式文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, f)
+
 
+# 当前进程的构建计时器（子进程中的文章渲染计时随结果返回后合并到这里）
+TIMER = StageTimer()
 
-def generate_category_index(category_name, display_name, articles, config, output_dir):
-    """生成 category 的 index.html - 步骤 2"""
-    # 按日期排序
-    articles = sorted(articles, key=lambda x: x['date'], reverse=True)
 
-    # ========== 步骤 2: 生成 Category Index ==========
-    # 使用模块化模板生成分类索引页
-    html = build_category_index_html(
-        config=config,
-        category_name=category_name,
-        display_name=display_name,
-        articles=articles,
-        relative_path=''
+# ============================================================
+# 资源同步 - 跳过未变化的文件，尽量避免逐字节复制
+# ============================================================
+
+def format_bytes(size):
+    """以 B / KB / MB / GB 显示字节数"""
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class AssetSync:
+    """将资源文件（图片、PDF、styles.css 等）同步到输出目录
+
+    目标文件大小与修改时间都与源文件一致时跳过（copy2 / 硬链接都会保留修改时间）。
+    需要写入时：link=True 优先硬链接（输出文件与源文件共享 inode），
+    否则优先 os.copy_file_range（在 btrfs / XFS 等文件系统上为 reflink，其余情况也在内核中完成复制），
+    都不可用时回退到 shutil.copy2。
+    """
+
+    def __init__(self, link=False):
+        self.link = link
+        self.counts = defaultdict(int)
+        self.bytes = defaultdict(int)
+
+    @staticmethod
+    def is_current(src_stat, dest):
+        try:
+            dest_stat = os.stat(dest)
+        except OSError:
+            return False
+        return (dest_stat.st_size == src_stat.st_size
+                and dest_stat.st_mtime_ns == src_stat.st_mtime_ns)
+
+    def sync(self, src, dest, src_stat=None):
+        """同步单个文件，返回执行的动作：skipped / linked / reflinked / copied
+
+        已有源文件的 stat 结果（例如 os.DirEntry.stat()）时传入 src_stat，避免再 stat 一次。
+        """
+        src_stat = src_stat or os.stat(src)
+        if self.is_current(src_stat, dest):
+            action = 'skipped'
+        else:
+            with TIMER.stage('copy'):
+                action = self._write(src, dest, src_stat)
+        return self.record(action, src_stat.st_size)
+
+    def record(self, action, size):
+        """计入一次同步动作与字节数（sync_static_file 写出精简内容时也通过这里计数），返回 action"""
+        self.counts[action] += 1
+        self.bytes[action] += size
+        return action
+
+    def _write(self, src, dest, src_stat):
+        if self.link:
+            try:
+                tmp = f"{dest}.tmp-link"
+                os.link(src, tmp)
+                os.replace(tmp, dest)
+                return 'linked'
+            except OSError:
+                pass  # 跨文件系统或不支持硬链接，改为复制
+        import shutil
+        if hasattr(os, 'copy_file_range') and src_stat.st_size:
+            try:
+                self._copy_file_range(src, dest, src_stat.st_size)
+                shutil.copystat(src, dest)
+                return 'reflinked'
+            except OSError:
+                pass  # 内核或文件系统不支持，改为普通复制
+        shutil.copy2(src, dest)
+        return 'copied'
+
+    @staticmethod
+    def _copy_file_range(src, dest, size):
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdest:
+            remaining = size
+            while remaining > 0:
+                sent = os.copy_file_range(fsrc.fileno(), fdest.fileno(), remaining)
+                if sent == 0:
+                    raise OSError("copy_file_range 提前结束")
+                remaining -= sent
+
+    def summary(self):
+        written_actions = ('copied', 'reflinked', 'linked', 'minified')
+        written = sum(self.counts[action] for action in written_actions)
+        written_bytes = sum(self.bytes[action] for action in written_actions)
+        parts = [f"写入 {written} 个文件 ({format_bytes(written_bytes)})"]
+        if self.counts['minified']:
+            parts.append(f"其中精简 {self.counts['minified']} 个")
+        if self.counts['linked']:
+            parts.append(f"其中硬链接 {self.counts['linked']} 个")
+        if self.counts['reflinked']:
+            parts.append(f"copy_file_range {self.counts['reflinked']} 个")
+        parts.append(f"跳过 {self.counts['skipped']} 个未变化文件 ({format_bytes(self.bytes['skipped'])})")
+        return "，".join(parts)
+
+
+# ============================================================
+# 后台文件读写 - 预读源文件、在后台写出页面
+# ============================================================
+
+# 后台读写线程在 trace 中使用的 tid（主线程为 0）
+IO_TRACE_TID = 1
+
+
+def _read_source(path, article, tracing):
+    """读取并哈希一个源文件（在 I/O 线程中执行），返回 (内容, 内容哈希, 计时)"""
+    timer = StageTimer(tracing=tracing, tid=IO_TRACE_TID)
+    with timer.stage('read', article):
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content_hash = hash_text(content)
+    return content, content_hash, timer.snapshot()
+
+
+def _write_fragments(path, fragments, article, tracing):
+    """写出页面片段（在 I/O 线程中执行），返回计时"""
+    timer = StageTimer(tracing=tracing, tid=IO_TRACE_TID)
+    with timer.stage('write', article):
+        write_page(path, fragments)
+    return timer.snapshot()
+
+
+class IOPipeline:
+    """文件读写流水线（--io-workers）
+
+    源文件读取与页面写出交给线程池：处理当前文章时预读其后的源文件，
+    渲染完成的页面交给后台写出，主线程继续下一篇。预读窗口与待写队列
+    各自最多 depth 项，内存占用不随文章数增长。workers=0 时同步读写。
+    计时在各 I/O 任务中单独记录，由主线程取回结果时合并到 TIMER。
+    """
+
+    def __init__(self, workers=0, depth=16):
+        self.depth = max(1, depth)
+        self._executor = None
+        if workers > 0:
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='io')
+        self._reads = {}
+        self._writes = deque()
+
+    def prefetch(self, paths):
+        """按顺序提交后续源文件的读取，已预读未取走的文件最多 depth 个"""
+        if self._executor is None:
+            return
+        for path, article in paths:
+            if len(self._reads) >= self.depth:
+                break
+            if path not in self._reads:
+                self._reads[path] = self._executor.submit(_read_source, path, article, TIMER.tracing)
+
+    def read_source(self, path, article=None):
+        """返回 (内容, 内容哈希)；已预读时直接取结果"""
+        future = self._reads.pop(path, None)
+        if future is None:
+            with TIMER.stage('read', article):
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = f.read()
+                return content, hash_text(content)
+        content, content_hash, timings = future.result()
+        TIMER.merge(timings)
+        return content, content_hash
+
+    def write(self, path, fragments, article=None):
+        """写出页面；有线程池时在后台写出，待写队列满时等待最早的写入完成"""
+        if self._executor is None:
+            with TIMER.stage('write', article):
+                write_page(path, fragments)
+            return
+        while len(self._writes) >= self.depth:
+            TIMER.merge(self._writes.popleft().result())
+        self._writes.append(self._executor.submit(_write_fragments, path, list(fragments), article, TIMER.tracing))
+        # 顺便回收已完成的写入
+        while self._writes and self._writes[0].done():
+            TIMER.merge(self._writes.popleft().result())
+
+    def flush(self):
+        """等待所有后台写入完成"""
+        while self._writes:
+            TIMER.merge(self._writes.popleft().result())
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            if self._executor is not None:
+                for future in self._reads.values():
+                    future.cancel()
+                self._reads.clear()
+                self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._writes.clear()
+            return
+        self.close()
+
+
+# ============================================================
+# 精简（minify） - 去掉生成页面与静态文件中无意义的空白和注释
+# ============================================================
+
+def minify_enabled(config):
+    return config.get('minify', {}).get('enabled', False)
+
+
+def _collapse_whitespace(text):
+    """包含换行的空白压成一个换行，其余连续空白压成一个空格（HTML 中二者等价）"""
+    return RE_MINIFY_SPACE_RUN.sub(' ', RE_MINIFY_NEWLINE_RUN.sub('\n', text))
+
+
+def minify_html(html):
+    """精简 HTML：删除注释并压缩空白
+
+    <pre> / <textarea> / <script> / <style> / <code> 与 $$...$$、$...$ 公式原样保留；
+    其余位置的连续空白只压缩不删除，渲染结果与原页面一致。
+    """
+    parts = []
+    pos = 0
+    for m in RE_MINIFY_HTML_PRESERVE.finditer(html):
+        parts.append(_collapse_whitespace(RE_MINIFY_HTML_COMMENT.sub('', html[pos:m.start()])))
+        parts.append(m.group(0))
+        pos = m.end()
+    parts.append(_collapse_whitespace(RE_MINIFY_HTML_COMMENT.sub('', html[pos:])))
+    return ''.join(parts).strip() + '\n'
+
+
+def _minify_css_code(code):
+    code = RE_MINIFY_CSS_PUNCT.sub(r'\1', RE_WHITESPACE.sub(' ', code))
+    return RE_MINIFY_CSS_COLON.sub(':', code).replace(';}', '}')
+
+
+def minify_css(css):
+    """精简 CSS：删除注释与空白，字符串原样保留
+
+    不改动选择器中 : 前的空格以及 + ~ ( ) 两侧的空格（后代选择器与 calc() 依赖它们）。
+    """
+    # 先把注释换成空格（字符串中的 /* 不受影响），再只压缩字符串以外的部分
+    css = RE_MINIFY_CSS_TOKEN.sub(lambda m: m.group(1) or ' ', css)
+    out = []
+    pos = 0
+    for m in RE_MINIFY_CSS_TOKEN.finditer(css):
+        out.append(_minify_css_code(css[pos:m.start()]))
+        out.append(m.group(0))
+        pos = m.end()
+    out.append(_minify_css_code(css[pos:]))
+    return ''.join(out).strip() + '\n'
+
+
+def minify_js(js):
+    """保守地精简 JS：删除注释、行首行尾空白与空行，保留换行（不影响自动分号插入）
+
+    字符串与模板字符串原样保留。正则字面量不做识别，其中不能出现引号或 //。
+    """
+    parts = []
+    pos = 0
+    for m in RE_MINIFY_JS_TOKEN.finditer(js):
+        parts.append(RE_MINIFY_SPACE_RUN.sub(' ', RE_MINIFY_NEWLINE_RUN.sub('\n', js[pos:m.start()])))
+        if m.group(1):
+            parts.append(m.group(1))
+        elif m.group(2).startswith('/*'):
+            parts.append(' ')
+        pos = m.end()
+    parts.append(RE_MINIFY_SPACE_RUN.sub(' ', RE_MINIFY_NEWLINE_RUN.sub('\n', js[pos:])))
+    return ''.join(parts).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+def finish_page(config, fragments, timer=None, article=None):
+    """开启 minify 时把页面片段合成一页并精简，返回待写出的片段；节省的字节数计入 timer"""
+    if not minify_enabled(config):
+        return fragments
+    timer = timer or TIMER
+    with timer.stage('minify', article):
+        html = ''.join(fragments)
+        minified = minify_html(html)
+    timer.count('minify_html_in', len(html.encode('utf-8')))
+    timer.count('minify_html_out', len(minified.encode('utf-8')))
+    return [minified]
+
+
+def sync_static_file(src, dest, assets, minify=False):
+    """同步 styles.css / script.js；minify 时写出精简后的内容（内容未变化时不重写），返回动作
+
+    精简写出的文件计为 minified，字节数按精简后的大小计入 assets 的统计。
+    """
+    minifier = MINIFIERS.get(Path(src).suffix) if minify else None
+    if minifier is None:
+        return assets.sync(src, dest)
+    with TIMER.stage('minify'):
+        source = Path(src).read_text(encoding='utf-8')
+        minified = minifier(source)
+    kind = Path(src).suffix[1:]
+    minified_size = len(minified.encode('utf-8'))
+    TIMER.count(f'minify_{kind}_in', len(source.encode('utf-8')))
+    TIMER.count(f'minify_{kind}_out', minified_size)
+    try:
+        if Path(dest).read_text(encoding='utf-8') == minified:
+            return assets.record('skipped', minified_size)
+    except (OSError, UnicodeDecodeError):
+        pass
+    Path(dest).unlink(missing_ok=True)  # 之前可能是指向源文件的硬链接
+    Path(dest).write_text(minified, encoding='utf-8')
+    return assets.record('minified', minified_size)
+
+
+def minify_summary(counters):
+    """精简统计的单行摘要（只统计本次写出的页面）"""
+    parts = []
+    for kind, label in (('html', 'HTML'), ('css', 'CSS'), ('js', 'JS')):
+        before, after = counters.get(f'minify_{kind}_in', 0), counters.get(f'minify_{kind}_out', 0)
+        if before:
+            parts.append(f"{label} {format_bytes(before)} → {format_bytes(after)}（节省 {(before - after) / before:.1%}）")
+    return "，".join(parts) if parts else "没有需要精简的文件"
+
+
+# ============================================================
+# 预压缩 - 为生成的页面写出 .gz / .br 副本（nginx gzip_static / brotli_static）
+# ============================================================
+
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json', '.xml')
+# 少于这个数量的文件需要压缩时不启动进程池
+COMPRESS_POOL_MIN_FILES = 32
+
+
+@lru_cache(maxsize=None)
+def load_brotli():
+    """按需导入可选依赖 brotli；未安装时返回 None（只生成 .gz）"""
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+def compression_encodings():
+    """可用的压缩副本后缀"""
+    return ('gz', 'br') if load_brotli() is not None else ('gz',)
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'gz':
+        import gzip
+        # mtime=0：内容不变时压缩结果也不变
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return load_brotli().compress(data, quality=11)
+
+
+def _compress_file(path, encodings):
+    """为一个文件写出指定的压缩副本（可在进程池中执行），返回 (原大小, {后缀: 压缩后大小})"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {}
+    for encoding in encodings:
+        sibling = f"{path}.{encoding}"
+        compressed = compress_bytes(data, encoding)
+        tmp_path = sibling + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, sibling)
+        sizes[encoding] = len(compressed)
+    return len(data), sizes
+
+
+def file_digest(path):
+    """计算文件内容的 SHA-256 摘要"""
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def compress_output(output_dir, jobs=1, prune_only=False, digests=None):
+    """为输出目录中的 HTML / CSS / JS / JSON / XML 写出压缩副本
+
+    digests 是上次压缩时记录的 {相对路径: 源文件内容摘要}（保存在构建清单中）。
+    副本是否最新按内容判断：AssetSync 硬链接 / copystat 会保留源文件较旧的 mtime，
+    按 mtime 判断会留下过期副本。摘要一致且副本齐全时跳过；源文件已不存在的副本删除。
+    prune_only=True 时不压缩，只删除过期与孤立的副本，避免 gzip_static 返回旧内容。
+    需要压缩的文件较多时用进程池（jobs 个进程）并行压缩。
+    返回统计 dict，其中 'digests' 是本次之后输出目录中压缩副本对应的源文件摘要。
+    """
+    encodings = compression_encodings()
+    all_encodings = ('gz', 'br')
+    digests = digests or {}
+    stats = {'compressed': 0, 'skipped': 0, 'removed': 0, 'kept': 0, 'original_bytes': 0,
+             'bytes': defaultdict(int), 'encodings': encodings, 'digests': {}}
+
+    def remove(path):
+        os.remove(path)
+        stats['removed'] += 1
+
+    todo = []
+    for root, _, files in os.walk(output_dir):
+        names = set(files)
+        for name in files:
+            path = os.path.join(root, name)
+            base, dot, encoding = name.rpartition('.')
+            if dot and encoding in all_encodings:
+                # 孤立的副本（源文件已删除）
+                if base not in names:
+                    remove(path)
+                elif not base.endswith(COMPRESSIBLE_SUFFIXES):
+                    stats['kept'] += 1
+                continue
+            if not name.endswith(COMPRESSIBLE_SUFFIXES):
+                continue
+            siblings = [e for e in all_encodings if f"{name}.{e}" in names]
+            if prune_only and not siblings:
+                continue
+            rel = os.path.relpath(path, output_dir).replace(os.sep, '/')
+            digest = file_digest(path)
+            fresh = digests.get(rel) == digest
+            if not fresh:
+                # 内容已变：旧副本一律作废（包括当前无法重新生成的 .br）
+                for encoding in siblings:
+                    remove(f"{path}.{encoding}")
+                siblings = []
+            if prune_only:
+                if siblings:
+                    stats['kept'] += len(siblings)
+                    stats['digests'][rel] = digest
+                continue
+            stats['digests'][rel] = digest
+            stale = tuple(e for e in encodings if e not in siblings)
+            if stale:
+                todo.append((path, stale))
+            else:
+                stats['skipped'] += 1
+
+    if not todo:
+        return stats
+    with TIMER.stage('compress'):
+        if jobs > 1 and len(todo) >= COMPRESS_POOL_MIN_FILES:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_compress_file, *zip(*todo), chunksize=16))
+        else:
+            results = [_compress_file(path, stale) for path, stale in todo]
+    for original, sizes in results:
+        stats['compressed'] += 1
+        stats['original_bytes'] += original
+        for encoding, size in sizes.items():
+            stats['bytes'][encoding] += size
+    return stats
+
+
+def compression_summary(stats):
+    """压缩统计的单行摘要"""
+    parts = [f"压缩 {stats['compressed']} 个文件 ({format_bytes(stats['original_bytes'])}"]
+    for encoding in stats['encodings']:
+        parts[0] += f" → .{encoding} {format_bytes(stats['bytes'][encoding])}"
+    parts[0] += ")"
+    parts.append(f"跳过 {stats['skipped']} 个已是最新的文件")
+    if stats['removed']:
+        parts.append(f"删除 {stats['removed']} 个过期副本")
+    if load_brotli() is None:
+        parts.append("未安装 brotli，只生成 .gz")
+    return "，".join(parts)
+
+
+# ============================================================
+# 全文搜索索引 - 按词项前缀分片的倒排表，由 script.js 按需加载
+# ============================================================
+
+SEARCH_DIR = "search"
+SEARCH_INDEX_VERSION = 1
+# CJK 词项按首字码点分桶的分片数（英文 / 数字词项按首字符分片）
+SEARCH_CJK_SHARDS = 64
+# 标题中的词项权重（正文每出现一次记 1）
+SEARCH_TITLE_WEIGHT = 10
+
+
+def search_enabled(config):
+    return config.get('search', {}).get('enabled', True)
+
+
+@lru_cache(maxsize=None)
+def search_cjk_patterns():
+    """返回 (CJK 二元组正则, 孤立 CJK 单字正则)
+
+    二元组用零宽前瞻一次取出所有重叠的两字组合，孤立的单字单独匹配。
+    大范围字符类编译约需 8 ms，索引未变化的构建用不到，因此不在导入时编译。
+    """
+    return (
+        re.compile(rf'(?=([{SEARCH_CJK_CHARS}]{{2}}))'),
+        # 先匹配 CJK 字符再回看前一个字符：非 CJK 位置只需一次字符类判断，比前置的否定回看快一倍
+        re.compile(rf'[{SEARCH_CJK_CHARS}](?<![{SEARCH_CJK_CHARS}]{{2}})(?![{SEARCH_CJK_CHARS}])'),
     )
 
-    # 写入文件到子目录下的 index.html
+
+def tokenize_for_search(text):
+    """搜索分词：英文与数字按词（小写，忽略单个字符），CJK 连续片段切成二元组（单字片段保留单字）"""
+    text = RE_SEARCH_STRIP.sub(' ', text.lower())
+    bigram, single = search_cjk_patterns()
+    return RE_SEARCH_WORD.findall(text) + bigram.findall(text) + single.findall(text)
+
+
+def search_shard_key(term):
+    """词项所在的分片名（与 script.js 中的 shardKey 一致）"""
+    if term.isascii():
+        return term[0]
+    return f"u{ord(term[0]) % SEARCH_CJK_SHARDS:02d}"
+
+
+def encode_varint(value, out):
+    """无符号 LEB128 编码，追加到 bytearray"""
+    while value > 0x7f:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_postings(data, start, end):
+    """解码 [start, end) 内的倒排表，返回 {文档编号: 权重}"""
+    postings = {}
+    doc_id = 0
+    pos = start
+    values = []
+    while pos < end:
+        value = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        values.append(value)
+        if len(values) == 2:
+            doc_id += values[0]
+            postings[doc_id] = values[1]
+            values = []
+    return postings
+
+
+class SearchIndex:
+    """构建全文搜索索引
+
+    search/docs.json 保存文章列表（标题、链接、日期、分类）与分片清单；
+    每个分片 search/<前缀>.json 保存排好序的词项、各词项倒排表的偏移，
+    以及 base64 编码的倒排表：按文档编号升序，(编号差值, 权重) 依次以 varint 编码。
+
+    文章按源文件内容哈希登记；所有文章与元数据都未变化时直接沿用上次的索引，
+    否则重新读取源文件分词，只写入内容有变化的分片。
+    """
+
+    def __init__(self, names=None):
+        # 分类显示名称（默认为 CATEGORY_NAMES），见 category_display_name
+        self.names = names
+        self.articles = []
+        self.sources = []
+        self.texts = {}
+
+    def add(self, article, source_path, content_hash, text=None):
+        """登记一篇文章（Article）；传入 text 时分词使用内存中的源文本，不再读取 source_path"""
+        if text is not None:
+            self.texts[len(self.articles)] = text
+        self.articles.append(article)
+        self.sources.append((str(source_path), content_hash))
+
+    def __len__(self):
+        return len(self.articles)
+
+    def docs(self):
+        """docs.json 中的文章列表：[标题, 链接（不带 .html）, 日期, 分类显示名称]"""
+        return [[article.title, f"{article.category}/{article.slug}", article.date,
+                 category_display_name(article.category, self.names)] for article in self.articles]
+
+    def digest(self):
+        return hash_text(json.dumps(self.docs(), ensure_ascii=False), *(h for _, h in self.sources))
+
+    def build_shards(self):
+        """读取源文件分词，返回 {分片名: 分片 JSON 文本}"""
+        from base64 import b64encode
+        postings = defaultdict(list)
+        for doc_id, (article, (source_path, _)) in enumerate(zip(self.articles, self.sources)):
+            text = self.texts.get(doc_id)
+            if text is None:
+                with open(source_path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            counts = Counter(tokenize_for_search(text))
+            for term in tokenize_for_search(article.title):
+                counts[term] += SEARCH_TITLE_WEIGHT
+            for term, weight in counts.items():
+                postings[term].append((doc_id, weight))
+
+        shard_terms = defaultdict(list)
+        for term in sorted(postings):
+            shard_terms[search_shard_key(term)].append(term)
+
+        shards = {}
+        for key, terms in shard_terms.items():
+            data = bytearray()
+            offsets = [0]
+            for term in terms:
+                previous = 0
+                for doc_id, weight in postings[term]:
+                    encode_varint(doc_id - previous, data)
+                    encode_varint(weight, data)
+                    previous = doc_id
+                offsets.append(len(data))
+            shards[key] = json.dumps({
+                'terms': terms,
+                'offsets': offsets,
+                'postings': b64encode(bytes(data)).decode('ascii'),
+            }, ensure_ascii=False, separators=(',', ':'))
+        return shards
+
+    def docs_json(self, shard_hashes):
+        """search/docs.json 的内容"""
+        return json.dumps({
+            'version': SEARCH_INDEX_VERSION,
+            'cjk_shards': SEARCH_CJK_SHARDS,
+            'shards': shard_hashes,
+            'docs': self.docs(),
+        }, ensure_ascii=False, separators=(',', ':'))
+
+    def files(self):
+        """在内存中生成全部索引文件，返回 {相对输出目录的路径: 文本}"""
+        shards = self.build_shards()
+        files = {f"{SEARCH_DIR}/{key}.json": text for key, text in sorted(shards.items())}
+        files[f"{SEARCH_DIR}/docs.json"] = self.docs_json({key: hash_text(text) for key, text in sorted(shards.items())})
+        return files
+
+    def write(self, output_dir, manifest=None):
+        """写入索引，返回 (写入的文件数, 文件总数)"""
+        search_dir = Path(output_dir) / SEARCH_DIR
+        docs_path = search_dir / "docs.json"
+        docs_digest = manifest.page_digest('search', self.digest()) if manifest else None
+
+        # 文章与内容都未变化且分片齐全：沿用上次的索引文件
+        if manifest and manifest.is_unchanged(docs_path, docs_digest):
+            try:
+                shard_hashes = json.loads(docs_path.read_text(encoding='utf-8'))['shards']
+            except (OSError, ValueError, KeyError):
+                shard_hashes = {}
+            shard_digests = {search_dir / f"{key}.json": manifest.page_digest('search-shard', h)
+                             for key, h in shard_hashes.items()}
+            if shard_digests and all(manifest.is_unchanged(path, d) for path, d in shard_digests.items()):
+                for path, d in shard_digests.items():
+                    manifest.is_current(path, d)
+                manifest.is_current(docs_path, docs_digest)
+                return 0, len(shard_digests) + 1
+
+        with TIMER.stage('search'):
+            shards = self.build_shards()
+        search_dir.mkdir(parents=True, exist_ok=True)
+        shard_hashes = {}
+        written = 0
+        for key, text in sorted(shards.items()):
+            shard_hashes[key] = hash_text(text)
+            shard_path = search_dir / f"{key}.json"
+            if manifest and manifest.is_current(shard_path, manifest.page_digest('search-shard', shard_hashes[key])):
+                continue
+            with TIMER.stage('search'):
+                shard_path.write_text(text, encoding='utf-8')
+            written += 1
+
+        if manifest and manifest.is_current(docs_path, docs_digest):
+            return written, len(shards) + 1
+        with TIMER.stage('search'):
+            docs_path.write_text(self.docs_json(shard_hashes), encoding='utf-8')
+        return written + 1, len(shards) + 1
+
+
+def query_search_index(search_dir, query, limit=20):
+    """按与 script.js 相同的规则查询已生成的索引，返回 [(得分, 文档)]（用于基准测试与调试）
+
+    所有查询词项都出现的文章才算命中，得分为各词项权重之和。
+    """
+    from base64 import b64decode
+    search_dir = Path(search_dir)
+    meta = json.loads((search_dir / "docs.json").read_text(encoding='utf-8'))
+    terms = set(tokenize_for_search(query))
+    if not terms:
+        return []
+
+    shards = {}
+    lists = []
+    for term in terms:
+        key = search_shard_key(term)
+        if key not in meta['shards']:
+            return []
+        if key not in shards:
+            shard = json.loads((search_dir / f"{key}.json").read_text(encoding='utf-8'))
+            shard['data'] = b64decode(shard['postings'])
+            shard['index'] = {t: i for i, t in enumerate(shard['terms'])}
+            shards[key] = shard
+        shard = shards[key]
+        i = shard['index'].get(term)
+        if i is None:
+            return []
+        lists.append(decode_postings(shard['data'], shard['offsets'][i], shard['offsets'][i + 1]))
+
+    lists.sort(key=len)
+    scores = []
+    for doc_id, weight in lists[0].items():
+        score = weight
+        for other in lists[1:]:
+            if doc_id not in other:
+                break
+            score += other[doc_id]
+        else:
+            scores.append((score, doc_id))
+    scores.sort(key=lambda item: (-item[0], item[1]))
+    return [(score, meta['docs'][doc_id]) for score, doc_id in scores[:limit]]
+
+
+# ============================================================
+# 主处理函数 - 按生成顺序: 文章 -> Category Index -> 首页
+# ============================================================
+
+def render_article(task, io=None):
+    """转换并写入单篇文章，返回 (用于日志显示的相对路径, 分阶段计时)
+
+    只依赖 task 中的数据，可在 ProcessPoolExecutor 的子进程中执行。
+    在主进程中执行时可传入 IOPipeline，页面交给它在后台写出（写出计时由它记录）。
+    """
+    timer = StageTimer(tracing=task['trace'])
+    article = task['source_key']
+
+    # 转换内容（跳过第一个标题，因为它会作为页面标题显示）；渲染缓存命中时直接使用缓存的正文
+    html_content = task.get('html')
+    if html_content is None:
+        with timer.stage('convert', article):
+            _, content_without_title = split_title(task['markdown'])
+            engine = markdown_engine(task['config'])
+            html_content = convert_markdown_to_html(content_without_title, engine)
+        if task.get('cache_dir'):
+            entry = dict(task['cache_meta'], html=html_content)
+            if RenderCache(task['cache_dir']).put(task['cache_key'], entry):
+                timer.count('render_cache_store')
+
+    # 使用模块化模板生成文章片段
+    with timer.stage('template', article):
+        fragments = list(iter_article_html(
+            config=task['config'],
+            title=task['title'],
+            date=task['date'],
+            category=task['category'],
+            content=html_content,
+            prev_link=task['prev_link'],
+            next_link=task['next_link'],
+            relative_path=task['relative_path'],
+            chrome=get_page_chrome(task['config'], task['config_hash'])
+        ))
+    fragments = finish_page(task['config'], fragments, timer, article)
+
+    if io is not None:
+        io.write(task['output_path'], fragments, article)
+    else:
+        with timer.stage('write', article):
+            write_page(task['output_path'], fragments)
+
+    return task['display_path'], timer.snapshot()
+
+
+class RenderQueue:
+    """文章渲染队列
+
+    jobs=1 时在当前进程中立即串行渲染（传入 io 时页面在后台写出）；jobs>1 时提交到进程池，
+    同时在途的任务不超过 depth 个（至少 jobs 个，保证每个进程都有任务），队列满时先等待任一任务完成，
+    完成的结果随即收集，内存占用与文章总数无关。并行时日志按完成顺序输出。
+    """
+
+    def __init__(self, jobs=1, io=None, depth=16):
+        self.jobs = jobs
+        self.io = io
+        self.depth = max(depth, jobs)
+        self._executor = None
+        if jobs > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            self._executor = ProcessPoolExecutor(max_workers=jobs)
+        self._pending = set()
+
+    def submit(self, task):
+        if self._executor is None:
+            self._finish(*render_article(task, self.io))
+            return
+        if len(self._pending) >= self.depth:
+            self._collect(wait_all=False)
+        self._pending.add(self._executor.submit(render_article, task))
+
+    def drain(self):
+        """等待所有已提交的文章渲染完成"""
+        while self._pending:
+            self._collect(wait_all=True)
+
+    def _collect(self, wait_all):
+        """等待在途任务（wait_all=False 时只等任一任务）完成并收集结果"""
+        from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, wait
+        done, self._pending = wait(self._pending, return_when=ALL_COMPLETED if wait_all else FIRST_COMPLETED)
+        for future in done:
+            self._finish(*future.result())
+
+    @staticmethod
+    def _finish(display_path, timings):
+        TIMER.merge(timings)
+        print(f"  ✓ {display_path}")
+
+    def close(self):
+        try:
+            self.drain()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None and self._executor is not None:
+            # 出错时不再等待剩余任务
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+            self._pending.clear()
+        self.close()
+
+
+class ArticleTable:
+    """一个分类的文章表：构建一次，按位置预先算好每篇文章的 Article 与上一篇 / 下一篇链接
+
+    articles 按文件名倒序排列（决定相邻文章链接），by_date 为分类索引页使用的日期倒序
+    （同一天的文章保持文件名倒序），两者共享同一组 Article，避免逐篇 list.index() 查找与重复排序。
+    Article 的标题、摘要与字数在分析文章后就地填入，process_category 直接返回 by_date。
+    """
+
+    def __init__(self, category_dir_name, md_names):
+        self.articles = [Article('', get_date_from_filename(name), category_dir_name, Path(name).stem)
+                         for name in sorted(md_names, reverse=True)]
+        self.by_date = sorted(self.articles, key=attrgetter('ordinal'), reverse=True)
+
+    def __iter__(self):
+        return iter(self.articles)
+
+    def __len__(self):
+        return len(self.articles)
+
+    def neighbours(self, idx):
+        """第 idx 篇文章的 (上一篇, 下一篇) 链接（不带 .html 后缀，因为在同一目录）"""
+        prev_link = self.articles[idx - 1].slug if idx > 0 else "#"
+        next_link = self.articles[idx + 1].slug if idx < len(self.articles) - 1 else "#"
+        return prev_link, next_link
+
+    def links(self):
+        """{文件名: (上一篇, 下一篇)}"""
+        return {article.name: self.neighbours(idx) for idx, article in enumerate(self.articles)}
+
+
+def article_task(config, config_hash, category_dir_name, category_name, md_name, content,
+                 title, date, prev_link, next_link, output_dir):
+    """构造 render_article() 的任务数据"""
+    html_filename = Path(md_name).stem + ".html"
+    return {
+        'config': config,
+        'config_hash': config_hash,
+        'title': title,
+        'date': date,
+        'category': category_name,
+        'markdown': content,
+        'prev_link': prev_link,
+        'next_link': next_link,
+        'relative_path': f"{category_dir_name}/",
+        'output_path': str(Path(output_dir) / category_dir_name / html_filename),
+        'display_path': f"{category_dir_name}/{html_filename}",
+        'source_key': f"{category_dir_name}/{md_name}",
+        'trace': TIMER.tracing,
+    }
+
+
+def process_category(category_dir, category_name, config, output_dir, manifest=None, render_queue=None, assets=None,
+                     search=None, io=None, files=None, cache=None):
+    """处理单个 category 目录 - 生成文章
+
+    category_name 为分类目录相对 DOCS_DIR 的路径（嵌套分类如 ml/optim），输出到 output_dir 下的同名目录。
+    files 为该目录下文件的 os.DirEntry 列表（walk_categories 的结果），未传入时自行 scandir。
+    传入 manifest 时进行增量构建：内容、相邻文章与日期都未变化的文章跳过转换与写入。
+    传入 render_queue 时文章渲染可能在进程池中异步完成，调用方需在结束前 drain()。
+    传入 search（SearchIndex）时把每篇文章登记到全文搜索索引。
+    传入 io（IOPipeline）时预读后续源文件。
+    传入 cache（RenderCache）时，需要分析或渲染的文章先查渲染缓存，未命中的文章渲染后写入缓存。
+    """
+    if render_queue is None:
+        render_queue = RenderQueue()
+    if assets is None:
+        assets = AssetSync()
+    if io is None:
+        io = IOPipeline()
+    config_hash = manifest.config_hash if manifest else hash_config(config)
+    engine = markdown_engine(config)
+
+    # 创建输出子目录（保持目录结构）
     output_subdir = Path(output_dir) / category_name
-    output_path = output_subdir / "index.html"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+    output_subdir.mkdir(parents=True, exist_ok=True)
 
-    print(f"  - {category_name}/index.html (索引页)")
+    # 获取目录下的所有文件
+    if files is None:
+        files = scan_files(category_dir)
 
+    # 处理 md 文件：文章表一次性算好顺序、日期与相邻链接
+    table = ArticleTable(category_name, [file.name for file in files if file.name.endswith('.md')])
+
+    # 同步非 md 文件（如图片），未变化的文件跳过；复用目录项的 stat 结果
+    for file in files:
+        if not file.name.endswith('.md'):
+            if assets.sync(file.path, output_subdir / file.name, file.stat()) != 'skipped':
+                print(f"  + {file.name} (copied)")
+
+    sources = [(category_dir / article.name, f"{category_name}/{article.name}") for article in table]
+    for idx, article in enumerate(table):
+        source_key = sources[idx][1]
+        date = article.date
+        prev_link, next_link = table.neighbours(idx)
+
+        # 读取 md 文件（同时预读后面的文章，在转换当前文章时完成读取）
+        io.prefetch(sources[idx:idx + io.depth + 1])
+        content, content_hash = io.read_source(*sources[idx])
+
+        # 生成 HTML 文件名（放在子目录中）
+        output_path = output_subdir / (article.slug + ".html")
+
+        # 页面输入：源内容、日期、分类名与相邻文章链接
+        unchanged = False
+        if manifest:
+            digest = manifest.page_digest('article', content_hash, date, category_name, prev_link, next_link)
+            unchanged = manifest.is_current(output_path, digest)
+
+        # 源文件内容未变化时复用上次的分析结果（标题、摘要、字数）；
+        # 清单中没有记录或页面需要重新渲染时查渲染缓存，都未命中才一次分析得到全部元数据
+        meta = manifest.lookup_source(source_key, content_hash) if manifest else None
+        cached = cache_key = None
+        if cache is not None and (meta is None or 'words' not in meta or not unchanged):
+            cache_key = cache.key(content, engine)
+            cached = cache.get(cache_key)
+            TIMER.count('render_cache_hit' if cached else 'render_cache_miss')
+        if cached:
+            meta = cached
+        elif meta is None or 'words' not in meta:
+            with TIMER.stage('extract', source_key):
+                meta = analyze_article(content, article.name)
+        article.title, article.excerpt, article.words = meta['title'], meta['excerpt'], meta['words']
+
+        if not unchanged:
+            # ========== 步骤 1: 生成文章页面 ==========
+            # 交给渲染队列（串行或进程池）转换并写入
+            task = article_task(
+                config, config_hash, category_name, category_name, article.name, content,
+                article.title, date, prev_link, next_link, output_dir
+            )
+            if cached:
+                task['html'] = cached['html']
+            elif cache_key:
+                task.update(cache_dir=str(cache.path), cache_key=cache_key,
+                            cache_meta={'title': article.title, 'excerpt': article.excerpt, 'words': article.words})
+            render_queue.submit(task)
+
+        if manifest:
+            manifest.record_source(source_key, content_hash, article)
+        if search is not None:
+            search.add(article, category_dir / article.name, content_hash)
+
+    # 按分类索引页的顺序（日期倒序）返回 Article 列表
+    return table.by_date
+
+
+def generate_category_index(category_name, display_name, articles, config, output_dir, manifest=None, chrome=None,
+                            io=None):
+    """生成 category 的 index.html（分页时还有 page/N/index.html）- 步骤 2
+
+    articles 需已按索引页顺序排列（即 ArticleTable.by_date 的顺序，process_category 的返回值）。
+    返回本分类全部索引页的路径（含未变化而跳过的页面）。
+    """
+    output_subdir = Path(output_dir) / category_name
+    pages = paginate(articles, articles_per_page(config))
+    page_count = len(pages)
+    page_paths = []
+
+    for page, page_articles in enumerate(pages, 1):
+        # 写入文件到子目录下的 index.html / page/N/index.html
+        output_path = output_subdir / category_page_path(page)
+        page_paths.append(output_path)
+
+        # 本页文章卡片、页码与总数都未变化时跳过
+        if manifest:
+            digest = manifest.page_digest(
+                'category', category_name, display_name, page, page_count, len(articles),
+                json.dumps([article.fields() for article in page_articles], ensure_ascii=False)
+            )
+            if manifest.is_current(output_path, digest):
+                continue
+
+        # ========== 步骤 2: 生成 Category Index ==========
+        # 使用模块化模板生成分类索引页，逐段写入文件（传入 io 时在后台写出）
+        fragments = iter_category_index_html(
+            config=config,
+            category_name=category_name,
+            display_name=display_name,
+            articles=page_articles,
+            relative_path='',
+            chrome=chrome,
+            page=page,
+            page_count=page_count,
+            article_count=len(articles)
+        )
+        fragments = finish_page(config, fragments)
+        with TIMER.stage('index'):
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            if io is None:
+                write_page(output_path, fragments)
+            else:
+                io.write(output_path, list(fragments))
+
+        if page == 1:
+            print(f"  - {category_name}/index.html (索引页)")
+        else:
+            print(f"  - {category_name}/{category_page_path(page)} (索引页 {page}/{page_count})")
+
+    return page_paths
 
-def generate_index_page(config, categories_info, output_dir):
-    """生成首页 index.html - 步骤 3"""
-    # ========== 步骤 3: 生成首页 ==========
-    # 使用模块化模板生成首页
-    html = build_index_html(config, categories_info)
 
-    # 写入文件
+def generate_index_page(config, categories_info, output_dir, manifest=None, chrome=None, io=None, recent=None):
+    """生成首页 index.html - 步骤 3；recent 为首页最近更新的文章（Article 列表）"""
     output_path = Path(output_dir) / "index.html"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html)
+
+    if manifest:
+        recent_fields = [article.fields() for article in recent or ()]
+        digest = manifest.page_digest('index', json.dumps([categories_info, recent_fields],
+                                                          sort_keys=True, ensure_ascii=False))
+        if manifest.is_current(output_path, digest):
+            return
+
+    # ========== 步骤 3: 生成首页 ==========
+    # 使用模块化模板生成首页，逐段写入文件
+    fragments = finish_page(config, iter_index_html(config, categories_info, chrome, recent))
+    with TIMER.stage('index'):
+        if io is None:
+            write_page(output_path, fragments)
+        else:
+            io.write(output_path, list(fragments))
 
     print(f"  - index.html (首页)")
 
 
-def main():
+def generate_archive_page(config, article_index, output_dir, manifest=None, chrome=None):
+    """生成归档页 archive/index.html（全站文章按日期倒序）
+
+    文章记录从各分类列表惰性归并后逐段写出：归档页可能很大，不经过 IOPipeline 的写出队列。
+    """
+    output_path = Path(output_dir) / ARCHIVE_DIR / "index.html"
+
+    if manifest:
+        digest = manifest.page_digest('archive', article_index.digest())
+        if manifest.is_current(output_path, digest):
+            return
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    fragments = iter_archive_html(config, article_index.iter_by_date(), len(article_index), chrome)
+    with TIMER.stage('index'):
+        write_page(output_path, finish_page(config, fragments))
+
+    print(f"  - {ARCHIVE_DIR}/index.html (归档页)")
+
+
+def category_summaries(index_articles):
+    """sitemap 需要的分类信息：{分类相对路径: (最新文章日期, 文章数)}，index_articles 见 category_index_articles"""
+    return {
+        category_name: (articles[0].date, len(articles))
+        for category_name, articles in index_articles.items() if articles
+    }
+
+
+def generate_sitemap(config, summaries, article_index, output_dir, manifest=None):
+    """流式写出 sitemap.xml（URL 超过 SITEMAP_MAX_URLS 时为索引加 sitemap-N.xml 分片）- 步骤 3"""
+    url_count = sitemap_url_count(config, summaries, article_index)
+    if manifest:
+        digest = manifest.page_digest('sitemap', article_index.digest(),
+                                      json.dumps(summaries, sort_keys=True, ensure_ascii=False))
+        names = sitemap_file_names(url_count)
+        # 每个文件都要登记到新清单，避免被当作过期页面删除
+        current = [manifest.is_current(Path(output_dir) / name, digest) for name in names]
+        if all(current):
+            return
+
+    urls = iter_sitemap_urls(config, summaries, article_index)
+    with TIMER.stage('index'):
+        for name, fragments in iter_sitemap_files(config, urls, url_count):
+            write_page(Path(output_dir) / name, fragments)
+    print(f"  - {SITEMAP_NAME} (站点地图，{url_count} 个 URL)")
+
+
+def generate_feed(config, article_index, output_dir, manifest=None):
+    """写出最新文章的 Atom feed - 步骤 3"""
+    output_path = Path(output_dir) / FEED_NAME
+    articles = article_index.recent(feed_count(config))
+
+    if manifest:
+        digest = manifest.page_digest('feed', json.dumps([article.fields() for article in articles], ensure_ascii=False))
+        if manifest.is_current(output_path, digest):
+            return
+
+    with TIMER.stage('index'):
+        write_page(output_path, iter_feed_xml(config, articles))
+    print(f"  - {FEED_NAME} (Atom feed，{len(articles)} 篇文章)")
+
+
+def category_info(config, category_name, display_name, count):
+    """首页分类卡片所需的分类信息（href 优先取 nav_menu 中的配置）"""
+    category_key = normalize_category_key(category_name)
+    cat_href = category_name
+    for item in config.get('nav_menu', []):
+        href = item.get('href', '')
+        if normalize_category_key(href) == category_key:
+            cat_href = href or category_name
+            break
+    return {
+        'name': category_name,
+        'display_name': display_name,
+        'href': cat_href,
+        'count': count
+    }
+
+
+# ============================================================
+# 库接口 - 内存构建（不读写磁盘）
+# ============================================================
+
+class SiteBuilder:
+    """由内存中的配置与源文件生成整个站点，返回 {输出相对路径: 内容}
+
+        builder = SiteBuilder({'site': {'title': 'Blog'}}, {'ml/2026-03-10-lr.md': '# 线性回归\n...'})
+        pages = builder.build()
+        pages['ml/2026-03-10-lr.html']   # 与 convert.py 写到 OUTPUT_DIR 的文件内容一致
+
+    sources 的键为 "分类目录/文件名"：.md 的值为 Markdown 文本，其他文件（图片等）的值原样输出。
+    不使用 DOCS_DIR / OUTPUT_DIR / CATEGORY_NAMES 等模块全局变量，也没有增量构建清单，
+    适合在 Web 服务中渲染预览或在测试中断言输出。static=True 时结果中包含 styles.css 与 script.js
+    （从 TEMPLATE_DIR 读取）。search 为 None 时按配置 search.enabled 生成全文搜索索引，
+    False 时不生成（分词约占内存构建耗时的一半，只预览页面时可以关闭）。
+    """
+
+    def __init__(self, config=None, sources=None, static=False, search=None):
+        self.config = merge_config(config)
+        self.sources = dict(sources or {})
+        self.static = static
+        self.search = search_enabled(self.config) if search is None else search
+        self.category_names = category_names(self.config)
+        # 精简节省的字节数等计数，不计入全局 TIMER
+        self.timer = StageTimer()
+
+    def categories(self):
+        """返回 {分类相对路径: {文件名: 内容}}，按路径排序（子分类如 ml/optim 紧随上级分类）"""
+        tree = defaultdict(dict)
+        for rel_path, content in self.sources.items():
+            category, _, name = rel_path.rpartition('/')
+            if not category or not name or '' in category.split('/'):
+                raise ValueError(f"源文件路径需为 分类目录/文件名: {rel_path}")
+            tree[category][name] = content
+        return dict(sorted(tree.items()))
+
+    def build(self):
+        config = self.config
+        engine = markdown_engine(config)
+        if engine not in MARKDOWN_ENGINES:
+            raise ValueError(f"未知的 Markdown 引擎: {engine}")
+        chrome = PageChrome(config)
+        search = SearchIndex(self.category_names) if self.search else None
+        pages = {}
+        categories_info = []
+
+        if self.static:
+            for static_file in ('styles.css', 'script.js'):
+                source = (TEMPLATE_DIR / static_file).read_text(encoding='utf-8')
+                minifier = MINIFIERS.get(Path(static_file).suffix) if minify_enabled(config) else None
+                pages[static_file] = minifier(source) if minifier else source
+
+        articles_by_category = {}
+        for category_name, files in self.categories().items():
+            display_name = category_display_name(category_name, self.category_names)
+            table = ArticleTable(category_name, [name for name in files if name.endswith('.md')])
+            for name, content in files.items():
+                if not name.endswith('.md'):
+                    pages[f"{category_name}/{name}"] = content
+
+            for idx, article in enumerate(table):
+                content = files[article.name]
+                # 一次分析得到标题、摘要与正文 HTML；内存构建没有构建摘要，不统计字数
+                meta = analyze_article(content, article.name, engine, count_words=False)
+                article.title, article.excerpt, article.words = meta['title'], meta['excerpt'], meta['words']
+                fragments = iter_article_html(config, article.title, article.date, category_name, meta['html'],
+                                              *table.neighbours(idx), f"{category_name}/", chrome)
+                pages[article.filename] = ''.join(finish_page(config, fragments, self.timer))
+                if search is not None:
+                    search.add(article, f"{category_name}/{article.name}", hash_text(content), text=content)
+            articles_by_category[category_name] = table.by_date
+
+        # 上级分类的索引页同时列出子分类中的文章，与 build() 一致
+        index_articles = category_index_articles(articles_by_category)
+        for category_name, ordered in sorted(index_articles.items()):
+            display_name = category_display_name(category_name, self.category_names)
+            paged = paginate(ordered, articles_per_page(config))
+            for page, page_articles in enumerate(paged, 1):
+                fragments = iter_category_index_html(config, category_name, display_name, page_articles,
+                                                     chrome=chrome, page=page, page_count=len(paged),
+                                                     article_count=len(ordered))
+                pages[f"{category_name}/{category_page_path(page)}"] = ''.join(finish_page(config, fragments, self.timer))
+            if '/' not in category_name:
+                categories_info.append(category_info(config, category_name, display_name, len(ordered)))
+
+        article_index = ArticleIndex()
+        for category_name, articles in articles_by_category.items():
+            if articles:
+                article_index.add_category(category_name, articles)
+        recent = article_index.recent(recent_count(config))
+        pages["index.html"] = ''.join(finish_page(config, iter_index_html(config, categories_info, chrome, recent),
+                                                  self.timer))
+        if archive_enabled(config):
+            fragments = iter_archive_html(config, article_index.iter_by_date(), len(article_index), chrome)
+            pages[f"{ARCHIVE_DIR}/index.html"] = ''.join(finish_page(config, fragments, self.timer))
+        if site_url(config):
+            if sitemap_enabled(config):
+                summaries = category_summaries(index_articles)
+                urls = iter_sitemap_urls(config, summaries, article_index)
+                url_count = sitemap_url_count(config, summaries, article_index)
+                for name, fragments in iter_sitemap_files(config, urls, url_count):
+                    pages[name] = ''.join(fragments)
+            if feed_count(config):
+                pages[FEED_NAME] = ''.join(iter_feed_xml(config, article_index.recent(feed_count(config))))
+        if search is not None:
+            pages.update(search.files())
+        return pages
+
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    import argparse
+    parser = argparse.ArgumentParser(description="Markdown 转 HTML 转换器")
+    parser.add_argument('--force', action='store_true',
+                        help=f"忽略 {BUILD_MANIFEST_NAME}，全量重建所有页面")
+    parser.add_argument('--engine', choices=sorted(MARKDOWN_ENGINES),
+                        help="Markdown 转换引擎（覆盖 _config.yaml 中的 markdown.engine）")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="并行渲染文章的进程数（默认 1 为串行，0 表示使用全部 CPU 核心）")
+    parser.add_argument('--io-workers', type=int, default=0, metavar='N',
+                        help="后台读写文件的线程数：预读源文件、在后台写出页面（默认 0 为同步读写，适合网络存储）")
+    parser.add_argument('--queue-depth', type=int, default=16, metavar='N',
+                        help="预读与待写页面（--io-workers）以及并行渲染中任务（--jobs）的队列深度上限，限制内存占用（默认 16）")
+    parser.add_argument('--compress', action='store_true',
+                        help="构建后为 HTML / CSS / JS / JSON / XML 写出 .gz（安装 brotli 时还有 .br）压缩副本，多进程并行")
+    parser.add_argument('--minify', action='store_true',
+                        help="精简生成的 HTML（保留 pre / code / 公式）与 styles.css、script.js（覆盖 _config.yaml 中的 minify.enabled）")
+    parser.add_argument('--link-assets', action='store_true',
+                        help="资源文件使用硬链接而不是复制（需与输出目录在同一文件系统；输出中的资源与源文件共享内容）")
+    parser.add_argument('--cache-dir', metavar='PATH',
+                        help=f"内容寻址的渲染缓存目录，可在多次构建之间共享（默认取环境变量 {RENDER_CACHE_ENV}，未设置时不使用缓存）")
+    parser.add_argument('--cache-max-mb', type=float, metavar='MB',
+                        help=f"渲染缓存大小上限，超出时淘汰最久未使用的条目（默认取 {RENDER_CACHE_SIZE_ENV} 或 {RENDER_CACHE_DEFAULT_MB}）")
+    parser.add_argument('--report', metavar='PATH',
+                        help="写出 JSON 构建报告：各阶段耗时与调用次数、最慢的文章")
+    parser.add_argument('--report-top', type=int, default=10, metavar='N',
+                        help="报告中列出的最慢文章数（默认 10）")
+    parser.add_argument('--trace', metavar='PATH',
+                        help="写出 Chrome trace event 文件（chrome://tracing / Perfetto）")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="用 cProfile 运行构建并保存统计文件（进程池模式下只统计主进程）")
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs 不能为负数")
+    if args.cache_max_mb is not None and args.cache_max_mb <= 0:
+        parser.error("--cache-max-mb 必须为正数")
+    if args.io_workers < 0 or args.queue_depth < 1:
+        parser.error("--io-workers 不能为负数，--queue-depth 至少为 1")
+    if args.jobs == 0:
+        args.jobs = os.cpu_count() or 1
+    return args
+
+
+def main(argv=None):
     # 设置输出编码为 UTF-8
     import sys
     sys.stdout.reconfigure(encoding='utf-8')
 
+    args = parse_args(argv)
+    TIMER.reset(tracing=bool(args.trace))
+
+    start = time.perf_counter()
+    if args.profile:
+        import cProfile
+        profiler = cProfile.Profile()
+        try:
+            profiler.runcall(build, args)
+        finally:
+            profiler.dump_stats(args.profile)
+        print(f"[性能] cProfile 统计已保存到 {args.profile}")
+    else:
+        build(args)
+    wall_seconds = time.perf_counter() - start
+
+    if args.report:
+        TIMER.write_report(args.report, wall_seconds, top=args.report_top)
+        print(f"[性能] 构建报告已保存到 {args.report}")
+    if args.trace:
+        TIMER.write_trace(args.trace)
+        print(f"[性能] trace 文件已保存到 {args.trace}")
+
+
+def build(args):
+    """执行一次构建：文章 -> Category Index -> 首页"""
     # 加载配置
     config = load_config()
+    if args.engine:
+        config.setdefault('markdown', {})['engine'] = args.engine
+    if args.minify:
+        config['minify'] = {**config.get('minify', {}), 'enabled': True}
+    engine = markdown_engine(config)
+    if engine not in MARKDOWN_ENGINES:
+        print(f"[错误] 未知的 Markdown 引擎: {engine}（可选: {', '.join(sorted(MARKDOWN_ENGINES))}）")
+        return
 
     print("=" * 50)
     print("Markdown to HTML 转换器")
@@ -860,6 +3631,12 @@ def main():
 
     print(f"\n输入目录: {DOCS_DIR}")
     print(f"输出目录: {OUTPUT_DIR}")
+    print(f"转换引擎: {engine}")
+    if minify_enabled(config):
+        print("精简输出: 开启")
+    cache = RenderCache.from_env(args.cache_dir, args.cache_max_mb)
+    if cache is not None:
+        print(f"渲染缓存: {cache.path}")
     print()
 
     # 创建输出目录
@@ -867,63 +3644,126 @@ def main():
     output_path.mkdir(parents=True, exist_ok=True)
 
     # 复制静态文件到输出目录
+    assets = AssetSync(link=args.link_assets)
     static_files = ['styles.css', 'script.js']
     for static_file in static_files:
         src = TEMPLATE_DIR / static_file
         if src.exists():
-            dest = output_path / static_file
-            shutil.copy2(src, dest)
-            print(f"[复制] {static_file}")
+            if sync_static_file(src, output_path / static_file, assets, minify_enabled(config)) != 'skipped':
+                print(f"[复制] {static_file}")
         else:
             print(f"❌ [未找到源文件] {src}")
 
+    # 读取增量构建清单
+    manifest = BuildManifest.load(OUTPUT_DIR, config, force=args.force)
+    for kind, deps in manifest.changed_dependencies().items():
+        names = ', '.join(dep.split(':', 1)[1] for dep in deps)
+        print(f"[依赖] {PAGE_KIND_NAMES[kind]}的依赖已变化: {names}")
+    # 页面公共片段（导航栏、页脚、头部）每次构建只渲染一次
+    chrome = get_page_chrome(config, manifest.config_hash)
+
     total_articles = 0
+    total_words = 0
     categories_info = []  # 收集分类信息用于生成首页
+    search = SearchIndex() if search_enabled(config) else None
 
     # ========== 步骤 1 & 2: 处理所有分类 ==========
-    # 遍历所有 category 目录
-    for category_dir in sorted(docs_path.iterdir()):
-        if not category_dir.is_dir():
-            continue
-
-        category_name = category_dir.name
-        category_key = normalize_category_key(category_name)
-        display_name = CATEGORY_NAMES.get(category_key, category_name)
-
-        print(f"[处理] 分类: {display_name}")
-
-        # 处理该分类下的所有 md 文件 (步骤1: 生成文章)
-        articles = process_category(category_dir, category_name, config, OUTPUT_DIR)
-
-        if articles:
-            # 生成索引页 (步骤2: 生成 Category Index)
-            generate_category_index(category_name, display_name, articles, config, OUTPUT_DIR)
-            total_articles += len(articles)
-
-            # 从 config 获取 href
-            cat_href = category_name
-            for item in config.get('nav_menu', []):
-                href = item.get('href', '')
-                if normalize_category_key(href) == category_key:
-                    cat_href = href or category_name
-                    break
-
-            # 收集分类信息
-            categories_info.append({
-                'name': category_name,
-                'display_name': display_name,
-                'href': cat_href,
-                'count': len(articles)
-            })
+    # 递归遍历 category 目录（嵌套子分类如 ml/optim/adam）
+    # 文章渲染可并行（--jobs），分类索引页与首页只依赖源文件元数据；
+    # --io-workers 时源文件预读与页面写出在后台线程中进行
+    categories = []  # 遍历顺序（路径先序）
+    articles_by_category = {}
+    with IOPipeline(args.io_workers, args.queue_depth) as io:
+        with RenderQueue(args.jobs, io, args.queue_depth) as render_queue:
+            for category_name, files in walk_categories(docs_path):
+                categories.append(category_name)
+                if not files:
+                    continue  # 只有子目录的上级目录
+
+                if any(file.name.endswith('.md') for file in files):
+                    print(f"[处理] 分类: {category_display_name(category_name)}")
+
+                # 处理该分类下的所有 md 文件，同步资源文件 (步骤1: 生成文章)
+                articles = process_category(docs_path / category_name, category_name, config, OUTPUT_DIR, manifest,
+                                            render_queue, assets, search, io, files, cache)
+                articles_by_category[category_name] = articles
+                total_articles += len(articles)
+                total_words += sum(article.words for article in articles)
+
+            # 生成索引页 (步骤2: 生成 Category Index)：上级分类的索引页同时列出子分类中的文章
+            index_articles = category_index_articles(articles_by_category)
+            for category_name in categories:
+                is_top_level = '/' not in category_name
+                if category_name not in index_articles:
+                    if is_top_level:
+                        print(f"  [警告] {category_name} 中没有找到 Markdown 文件")
+                    continue
+                articles = index_articles[category_name]
+                display_name = category_display_name(category_name)
+                generate_category_index(category_name, display_name, articles, config, OUTPUT_DIR, manifest,
+                                        chrome, io)
+                # 收集分类信息（首页只列出顶层分类，文章数包含子分类）
+                if is_top_level:
+                    categories_info.append(category_info(config, category_name, display_name, len(articles)))
+
+        # ========== 步骤 3: 生成首页 index.html 与归档页 ==========
+        # 全站文章索引由各分类（已按日期倒序）的文章列表组成，最近更新与归档页按日期归并
+        article_index = ArticleIndex()
+        for category_name, articles in articles_by_category.items():
+            if articles:
+                article_index.add_category(category_name, articles)
+        generate_index_page(config, categories_info, OUTPUT_DIR, manifest, chrome, io,
+                            recent=article_index.recent(recent_count(config)))
+        if archive_enabled(config):
+            generate_archive_page(config, article_index, OUTPUT_DIR, manifest, chrome)
+
+        # sitemap.xml 与 Atom feed：复用文章索引与分类索引页的文章列表，逐条写出
+        if site_url(config):
+            if sitemap_enabled(config):
+                generate_sitemap(config, category_summaries(index_articles), article_index, OUTPUT_DIR, manifest)
+            if feed_count(config):
+                generate_feed(config, article_index, OUTPUT_DIR, manifest)
         else:
-            print(f"  [警告] 没有找到 Markdown 文件")
-
-    # ========== 步骤 3: 生成首页 index.html ==========
-    generate_index_page(config, categories_info, OUTPUT_DIR)
+            # 只有显式启用时才提示（默认在未配置 site.url 时不生成）
+            skipped = [name for name, enabled in ((SITEMAP_NAME, sitemap_enabled(config)), (FEED_NAME, feed_count(config)))
+                       if enabled]
+            if skipped:
+                print(f"  [提示] 未配置 site.url，跳过 {' 与 '.join(skipped)}")
+
+    # ========== 步骤 4: 全文搜索索引 ==========
+    if search is not None:
+        written, total = search.write(OUTPUT_DIR, manifest)
+        print(f"[搜索] 索引 {len(search)} 篇文章，写入 {written}/{total} 个索引文件")
+
+    # 清理已删除源文件对应的页面
+    for stale in manifest.remove_stale_pages():
+        print(f"  x {stale} (已删除)")
+
+    # ========== 步骤 5: 预压缩（--compress） ==========
+    # 未压缩的构建也要删除过期的压缩副本，否则 gzip_static 会返回旧页面
+    compress_stats = None
+    if args.compress:
+        compress_stats = compress_output(OUTPUT_DIR, jobs=args.jobs if args.jobs > 1 else (os.cpu_count() or 1),
+                                         digests=manifest.compressed)
+        manifest.compressed = compress_stats['digests']
+    elif manifest.compressed is None or manifest.compressed:
+        manifest.compressed = compress_output(OUTPUT_DIR, prune_only=True, digests=manifest.compressed)['digests']
+    manifest.save()
+
+    # 渲染缓存按 LRU 淘汰到上限以内
+    cache_stats = cache.prune() if cache is not None else None
 
     print()
     print("=" * 50)
-    print(f"[完成] 转换完成! 共处理 {total_articles} 篇文章")
+    print(f"[完成] 转换完成! 共处理 {total_articles} 篇文章（共 {total_words} 字）")
+    print(f"[增量] 重新生成 {manifest.written} 个页面，跳过 {manifest.skipped} 个未变化页面")
+    print(f"[资源] {assets.summary()}")
+    if minify_enabled(config):
+        print(f"[精简] {minify_summary(TIMER.counters)}")
+    if compress_stats:
+        print(f"[压缩] {compression_summary(compress_stats)}")
+    if cache is not None:
+        print(f"[缓存] {render_cache_summary(TIMER.counters, cache_stats)}")
     print("=" * 50)
 
 
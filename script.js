@@ -120,3 +120,188 @@ document.querySelectorAll('.blog-card').forEach((card, index) => {
     card.style.transition = `opacity 0.5s ease ${index * 0.1}s, transform 0.5s ease ${index * 0.1}s`;
     observer.observe(card);
 });
+
+// ==================== 全文搜索 ====================
+// 索引由 convert.py 生成在 search/ 下：docs.json 为文章列表与分片清单，
+// 其余文件为按词项前缀分片的倒排表，查询时只加载查询词所在的分片
+const SEARCH_BASE = document.currentScript ? new URL('search/', document.currentScript.src) : null;
+// 与 convert.py 中的 tokenize_for_search（RE_SEARCH_WORD / RE_SEARCH_CJK_*）规则一致
+const SEARCH_TOKEN = /[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+/g;
+const SEARCH_LIMIT = 20;
+const searchFiles = new Map();
+
+// 分词：英文与数字按词（忽略单个字符），CJK 片段切成二元组
+function searchTokens(text) {
+    const tokens = new Set();
+    for (const match of text.toLowerCase().matchAll(SEARCH_TOKEN)) {
+        const token = match[0];
+        if (/^[a-z0-9]/.test(token)) {
+            if (token.length > 1) tokens.add(token);
+        } else if (token.length === 1) {
+            tokens.add(token);
+        } else {
+            for (let i = 0; i < token.length - 1; i++) {
+                tokens.add(token.slice(i, i + 2));
+            }
+        }
+    }
+    return [...tokens];
+}
+
+function shardKey(term, cjkShards) {
+    if (/^[a-z0-9]/.test(term)) return term[0];
+    return 'u' + String(term.charCodeAt(0) % cjkShards).padStart(2, '0');
+}
+
+// 每个索引文件只请求一次
+function loadSearchFile(name) {
+    if (!searchFiles.has(name)) {
+        searchFiles.set(name, fetch(new URL(name, SEARCH_BASE)).then(response => {
+            if (!response.ok) throw new Error(`${name}: ${response.status}`);
+            return response.json();
+        }));
+    }
+    return searchFiles.get(name);
+}
+
+// 分片首次使用时解码：词项 -> 序号，倒排表转为字节数组
+function prepareShard(shard) {
+    if (!shard.index) {
+        shard.index = new Map(shard.terms.map((term, i) => [term, i]));
+        shard.bytes = Uint8Array.from(atob(shard.postings), c => c.charCodeAt(0));
+    }
+    return shard;
+}
+
+// 解码一个词项的倒排表：(文档编号差值, 权重) 依次以 varint 编码
+function decodePostings(shard, i) {
+    const bytes = shard.bytes;
+    const end = shard.offsets[i + 1];
+    const postings = new Map();
+    let pos = shard.offsets[i];
+    let docId = 0;
+    const readVarint = () => {
+        let value = 0;
+        let shift = 0;
+        let byte;
+        do {
+            byte = bytes[pos++];
+            value += (byte & 0x7f) * 2 ** shift;
+            shift += 7;
+        } while (byte >= 0x80);
+        return value;
+    };
+    while (pos < end) {
+        docId += readVarint();
+        postings.set(docId, readVarint());
+    }
+    return postings;
+}
+
+// 所有查询词项都出现的文章才算命中，得分为各词项权重之和
+async function searchArticles(query) {
+    const terms = searchTokens(query);
+    if (!terms.length) return [];
+    const meta = await loadSearchFile('docs.json');
+    const keys = terms.map(term => shardKey(term, meta.cjk_shards));
+    if (keys.some(key => !(key in meta.shards))) return [];
+
+    const shards = await Promise.all(keys.map(key => loadSearchFile(`${key}.json`)));
+    const lists = [];
+    for (let t = 0; t < terms.length; t++) {
+        const shard = prepareShard(shards[t]);
+        const i = shard.index.get(terms[t]);
+        if (i === undefined) return [];
+        lists.push(decodePostings(shard, i));
+    }
+
+    lists.sort((a, b) => a.size - b.size);
+    const hits = [];
+    for (const [docId, weight] of lists[0]) {
+        let score = weight;
+        let matched = true;
+        for (let l = 1; l < lists.length && matched; l++) {
+            const other = lists[l].get(docId);
+            if (other === undefined) matched = false;
+            else score += other;
+        }
+        if (matched) hits.push([score, docId]);
+    }
+    hits.sort((a, b) => b[0] - a[0] || a[1] - b[1]);
+    return hits.slice(0, SEARCH_LIMIT).map(([score, docId]) => meta.docs[docId]);
+}
+
+function renderSearchResults(container, docs, query) {
+    container.innerHTML = '';
+    if (!query.trim()) {
+        container.classList.remove('active');
+        return;
+    }
+    const siteRoot = new URL('..', SEARCH_BASE);
+    if (!docs.length) {
+        const empty = document.createElement('p');
+        empty.className = 'search-empty';
+        empty.textContent = '没有找到相关文章';
+        container.appendChild(empty);
+    }
+    docs.forEach(([title, url, date, category]) => {
+        const link = document.createElement('a');
+        link.className = 'search-result';
+        link.href = new URL(url, siteRoot).href;
+        const name = document.createElement('span');
+        name.className = 'search-result-title';
+        name.textContent = title;
+        const info = document.createElement('span');
+        info.className = 'search-result-meta';
+        info.textContent = `${category} · ${date}`;
+        link.append(name, info);
+        container.appendChild(link);
+    });
+    container.classList.add('active');
+}
+
+// 在导航栏中加入搜索框；索引不存在（配置关闭搜索）时移除
+document.addEventListener('DOMContentLoaded', function() {
+    const navMenu = document.getElementById('navMenu');
+    if (!navMenu || !SEARCH_BASE) return;
+
+    const item = document.createElement('li');
+    item.className = 'nav-search';
+    item.innerHTML = '<input type="search" class="search-input" placeholder="搜索文章" aria-label="搜索文章">' +
+        '<div class="search-results"></div>';
+    navMenu.appendChild(item);
+
+    const input = item.querySelector('.search-input');
+    const results = item.querySelector('.search-results');
+    let timer = null;
+    let latest = 0;
+
+    input.addEventListener('focus', function() {
+        loadSearchFile('docs.json').catch(() => item.remove());
+    }, { once: true });
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const query = input.value;
+            const seq = ++latest;
+            try {
+                const docs = await searchArticles(query);
+                if (seq === latest) renderSearchResults(results, docs, query);
+            } catch (err) {
+                console.error('Search failed:', err);
+            }
+        }, 150);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        if (e.key === 'Escape') {
+            input.value = '';
+            renderSearchResults(results, [], '');
+        }
+    });
+
+    document.addEventListener('click', function(e) {
+        if (!item.contains(e.target)) results.classList.remove('active');
+    });
+});
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+本地预览服务器
+
+    python serve.py [--watch] [--port 8000] [--jobs N]
+
+先执行一次增量构建，再用 http.server 提供 OUTPUT_DIR。
+--watch 时轮询 DOCS_DIR、_config.yaml、styles.css 与 script.js：
+单篇 .md 变化只重新生成该文章、链接发生变化的相邻文章、所在分类及其上级分类的 index.html，
+以及首页（最近更新）、归档页、sitemap.xml、Atom feed 与全文搜索索引（内容未变的分片不重写），
+配置变化时执行一次增量构建。
+"""
+
+import os
+import sys
+import time
+import argparse
+import functools
+import threading
+from pathlib import Path
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import convert
+
+CONFIG_FILES = ("_config.yaml", "_config.yml")
+STATIC_FILES = ("styles.css", "script.js")
+
+
+class SiteRequestHandler(SimpleHTTPRequestHandler):
+    """静态文件处理：无后缀的文章链接回退到 .html（与 GitHub Pages 一致）"""
+
+    def translate_path(self, path):
+        fs_path = super().translate_path(path)
+        if not os.path.exists(fs_path) and os.path.isfile(fs_path + '.html'):
+            return fs_path + '.html'
+        return fs_path
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def start_server(directory, host, port, verbose=False):
+    """在后台线程中启动 HTTP 服务器"""
+    handler = functools.partial(SiteRequestHandler, directory=str(directory))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.verbose = verbose
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def scan_sources(docs_dir, output_dir):
+    """返回 {分类相对路径: {文件名: (mtime_ns, size)}}，遍历与剪枝规则与 convert.walk_categories 一致"""
+    tree = {}
+    for category, files in convert.walk_categories(docs_dir, output_dir):
+        tree[category] = {}
+        for entry in files:
+            stat = entry.stat()
+            tree[category][entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return tree
+
+
+def parent_categories(category):
+    """分类自身及其各级上级分类，例如 ml/optim/adam -> [ml/optim/adam, ml/optim, ml]"""
+    chain = [category]
+    while '/' in category:
+        category = category.rpartition('/')[0]
+        chain.append(category)
+    return chain
+
+
+def remove_extra_index_pages(output_subdir, keep):
+    """删除不在 keep 中的分类索引页（index.html 与 page/N/index.html），返回被删除的路径"""
+    keep = set(keep)
+    candidates = [output_subdir / "index.html"] + sorted(output_subdir.glob("page/*/index.html"))
+    removed = []
+    for path in candidates:
+        if path not in keep and path.exists():
+            path.unlink()
+            if path.parent != output_subdir and not any(path.parent.iterdir()):
+                path.parent.rmdir()
+            removed.append(path)
+    return removed
+
+
+def remove_empty_dirs(directory, stop):
+    """自 directory 起逐级向上删除空目录，直到 stop（不含）"""
+    while directory != stop and directory.is_dir() and not any(directory.iterdir()):
+        directory.rmdir()
+        directory = directory.parent
+
+
+class SiteWatcher:
+    """跟踪源文件状态，把变化映射为最小的页面重建集合"""
+
+    def __init__(self, jobs=1):
+        self.jobs = jobs
+        self.docs_dir = Path(convert.DOCS_DIR)
+        self.output_dir = Path(convert.OUTPUT_DIR)
+        self.assets = convert.AssetSync()
+
+    # ---------- 全量（增量）构建 ----------
+
+    def full_build(self):
+        convert.main(['--jobs', str(self.jobs)])
+        self.config = convert.load_config()
+        self.config_hash = convert.hash_config(self.config)
+        self.chrome = convert.get_page_chrome(self.config, self.config_hash)
+        self.tree = scan_sources(self.docs_dir, self.output_dir)
+        self.watched = self._watched_signatures()
+
+        # 文章元数据优先取自构建清单，避免重新读取所有源文件
+        manifest = convert.BuildManifest.load(self.output_dir, self.config)
+        self.meta = {}
+        # {分类/文件名: 源文件内容哈希}，用于重建搜索索引
+        self.hashes = {}
+        for category, files in self.tree.items():
+            self.meta[category] = {}
+            for name in files:
+                if name.endswith('.md'):
+                    cached = manifest.previous_source(f"{category}/{name}")
+                    self.meta[category][name] = self._article_meta(category, name, cached)
+
+    def _watched_signatures(self):
+        paths = [self.docs_dir / name for name in CONFIG_FILES]
+        paths += [convert.TEMPLATE_DIR / name for name in STATIC_FILES]
+        return {path: file_signature(path) for path in paths}
+
+    # ---------- 轮询 ----------
+
+    def poll(self):
+        """检查一次变化并执行对应的重建"""
+        watched = self._watched_signatures()
+        changed_watched = [path for path, sig in watched.items() if sig != self.watched.get(path)]
+        self.watched = watched
+
+        if any(path.name in CONFIG_FILES for path in changed_watched):
+            print("[监视] 配置已变化，执行增量构建")
+            self.full_build()
+            return
+        for path in changed_watched:
+            if path.exists():
+                convert.sync_static_file(path, self.output_dir / path.name, self.assets,
+                                         convert.minify_enabled(self.config))
+                print(f"[监视] {path.name} 已更新")
+
+        tree = scan_sources(self.docs_dir, self.output_dir)
+        articles_changed = False
+        for category in sorted(tree.keys() | self.tree.keys()):
+            old_files = self.tree.get(category, {})
+            new_files = tree.get(category, {})
+            if old_files == new_files:
+                continue
+            changed = {name for name, sig in new_files.items() if old_files.get(name) != sig}
+            removed = old_files.keys() - new_files.keys()
+            articles_changed |= self.rebuild_category(category, old_files, new_files, changed, removed)
+        self.tree = tree
+
+        # 文章数、标题或日期变化都会影响首页的最近更新与归档页；文章内容变化还会影响搜索索引
+        if articles_changed:
+            self.write_index_page()
+            self.write_search_index()
+
+    # ---------- 单文件重建 ----------
+
+    def rebuild_category(self, category, old_files, new_files, changed, removed):
+        """重建一个分类中受影响的页面；有文章新增、删除或重新生成时返回 True"""
+        start = time.perf_counter()
+        output_subdir = self.output_dir / category
+        output_subdir.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        # 非 md 资源同步 / 删除
+        for name in sorted(changed):
+            if not name.endswith('.md'):
+                if self.assets.sync(self.docs_dir / category / name, output_subdir / name) != 'skipped':
+                    print(f"  + {category}/{name} (copied)")
+        for name in sorted(removed):
+            target = output_subdir / (Path(name).stem + '.html' if name.endswith('.md') else name)
+            if target.exists():
+                target.unlink()
+                written.append(target)
+                print(f"  x {category}/{target.name} (已删除)")
+
+        old_table = convert.ArticleTable(category, [n for n in old_files if n.endswith('.md')])
+        table = convert.ArticleTable(category, [n for n in new_files if n.endswith('.md')])
+        old_links = old_table.links()
+
+        meta = self.meta.setdefault(category, {})
+        for name in removed:
+            meta.pop(name, None)
+            self.hashes.pop(f"{category}/{name}", None)
+
+        for idx, entry in enumerate(table):
+            name = entry.name
+            links = table.neighbours(idx)
+            # 内容变化的文章，以及上一篇 / 下一篇链接变化的相邻文章
+            if name not in changed and old_links.get(name) == links:
+                continue
+            with open(self.docs_dir / category / name, 'r', encoding='utf-8') as f:
+                content = f.read()
+            article = meta[name] = self._article_meta(category, name, None, content)
+            task = convert.article_task(
+                self.config, self.config_hash, category, category, name, content,
+                article.title, article.date, links[0], links[1], self.output_dir
+            )
+            display_path, _ = convert.render_article(task)
+            written.append(Path(task['output_path']))
+            print(f"  ✓ {display_path}")
+
+        if not new_files:
+            # 分类已删除：索引页随之删除，再清理留下的空目录
+            self.meta.pop(category, None)
+        written.extend(self.write_category_indexes(category))
+        if not new_files:
+            remove_empty_dirs(output_subdir, self.output_dir)
+
+        # 这些页面绕过了构建清单，需让下次 convert.py 构建重新生成它们
+        convert.BuildManifest.invalidate_pages(self.output_dir, written)
+        print(f"[监视] {category}: 重建 {len(written)} 个页面 ({(time.perf_counter() - start) * 1000:.1f} ms)")
+        return bool(removed) or any(name.endswith('.md') for name in changed)
+
+    def category_articles(self, category):
+        """分类自身的文章信息，按 ArticleTable.by_date 排序"""
+        meta = self.meta.get(category, {})
+        return [meta[entry.name] for entry in convert.ArticleTable(category, list(meta)).by_date]
+
+    def write_category_indexes(self, category):
+        """重新生成分类及其各级上级分类的索引页（上级分类同时列出子分类中的文章），返回写出与删除的路径"""
+        chain = parent_categories(category)
+        related = {
+            name: self.category_articles(name) for name in self.meta
+            if any(name == target or name.startswith(target + '/') for target in chain)
+        }
+        index_articles = convert.category_index_articles(related)
+        written = []
+        for target in chain:
+            page_paths = []
+            if target in index_articles:
+                page_paths = convert.generate_category_index(target, convert.category_display_name(target),
+                                                             index_articles[target], self.config,
+                                                             self.output_dir, chrome=self.chrome)
+                written.extend(page_paths)
+            # 分页减少（或分类中已没有文章）时删除多余的索引页，与 convert.py 一致
+            written.extend(remove_extra_index_pages(self.output_dir / target, page_paths))
+        return written
+
+    def write_index_page(self):
+        # 首页只列出顶层分类，文章数包含子分类
+        counts = defaultdict(int)
+        for category, meta in self.meta.items():
+            counts[category.partition('/')[0]] += len(meta)
+        categories_info = []
+        for category in sorted(counts):
+            if counts[category]:
+                display_name = convert.category_display_name(category)
+                categories_info.append(convert.category_info(self.config, category, display_name, counts[category]))
+
+        articles_by_category = {category: self.category_articles(category) for category in self.meta}
+        article_index = convert.ArticleIndex()
+        for category, articles in articles_by_category.items():
+            article_index.add_category(category, articles)
+        convert.generate_index_page(self.config, categories_info, self.output_dir, chrome=self.chrome,
+                                    recent=article_index.recent(convert.recent_count(self.config)))
+        written = [self.output_dir / "index.html"]
+        if convert.archive_enabled(self.config):
+            convert.generate_archive_page(self.config, article_index, self.output_dir, chrome=self.chrome)
+            written.append(self.output_dir / convert.ARCHIVE_DIR / "index.html")
+        if convert.site_url(self.config):
+            if convert.sitemap_enabled(self.config):
+                summaries = convert.category_summaries(convert.category_index_articles(articles_by_category))
+                convert.generate_sitemap(self.config, summaries, article_index, self.output_dir)
+                url_count = convert.sitemap_url_count(self.config, summaries, article_index)
+                written += [self.output_dir / name for name in convert.sitemap_file_names(url_count)]
+            if convert.feed_count(self.config):
+                convert.generate_feed(self.config, article_index, self.output_dir)
+                written.append(self.output_dir / convert.FEED_NAME)
+        convert.BuildManifest.invalidate_pages(self.output_dir, written)
+
+    def write_search_index(self):
+        """重建全文搜索索引：文章顺序与 convert.py 一致，由构建清单判断索引与各分片是否需要重写"""
+        if not convert.search_enabled(self.config):
+            return
+        search = convert.SearchIndex()
+        for category in self.tree:
+            meta = self.meta.get(category, {})
+            for entry in convert.ArticleTable(category, list(meta)):
+                source_key = f"{category}/{entry.name}"
+                search.add(meta[entry.name], self.docs_dir / source_key, self.hashes[source_key])
+        manifest = convert.BuildManifest.load(self.output_dir, self.config)
+        written, total = search.write(self.output_dir, manifest)
+        # 摘要的计算方式与 convert.py 相同，写回清单后下次构建也能沿用这些索引文件
+        convert.BuildManifest.record_pages(self.output_dir, manifest.pages)
+        # 不再有词项的分片
+        stale = [path for path in (self.output_dir / convert.SEARCH_DIR).glob('*.json')
+                 if path.relative_to(self.output_dir).as_posix() not in manifest.pages]
+        for path in stale:
+            path.unlink()
+        convert.BuildManifest.invalidate_pages(self.output_dir, stale)
+        if written:
+            print(f"[监视] 搜索索引: 写入 {written}/{total} 个索引文件")
+
+    def _article_meta(self, category, name, cached, content=None):
+        """与 process_category 收集的文章信息（convert.Article）一致，同时记录源文件内容哈希"""
+        if cached is None or 'words' not in cached:
+            if content is None:
+                with open(self.docs_dir / category / name, 'r', encoding='utf-8') as f:
+                    content = f.read()
+            cached = dict(convert.analyze_article(content, name), hash=convert.hash_text(content))
+        self.hashes[f"{category}/{name}"] = cached['hash']
+        return convert.Article(cached['title'], convert.get_date_from_filename(name), category, Path(name).stem,
+                               cached['excerpt'], cached['words'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="本地预览服务器")
+    parser.add_argument('--watch', action='store_true', help="监视源文件变化并增量重建")
+    parser.add_argument('--host', default='127.0.0.1', help="监听地址（默认 127.0.0.1）")
+    parser.add_argument('--port', type=int, default=8000, help="监听端口（默认 8000）")
+    parser.add_argument('--interval', type=float, default=0.3, help="轮询间隔秒数（默认 0.3）")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="启动与配置变化时构建使用的进程数")
+    parser.add_argument('-v', '--verbose', action='store_true', help="输出每个 HTTP 请求")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    sys.stdout.reconfigure(encoding='utf-8')
+    args = parse_args(argv)
+
+    watcher = SiteWatcher(jobs=args.jobs)
+    watcher.full_build()
+
+    server = start_server(watcher.output_dir, args.host, args.port, args.verbose)
+    print(f"\n[服务] http://{args.host}:{args.port}/  (Ctrl+C 退出)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            if args.watch:
+                watcher.poll()
+    except KeyboardInterrupt:
+        print("\n[服务] 已停止")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""convert.py 的回归测试
+
+    python -m unittest discover tests
+"""
+
+import sys
+import shutil
+import tempfile
+import subprocess
+import unittest
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import convert
+
+
+def run_convert(site_dir, *argv):
+    """在 site_dir 中运行一次 convert.py（模块全局的输入 / 输出目录相对当前目录）"""
+    subprocess.run([sys.executable, str(ROOT / "convert.py"), *argv], cwd=site_dir,
+                   stdout=subprocess.DEVNULL, check=True)
+
+
+class ForceBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.site = Path(tempfile.mkdtemp(prefix='convert-test-'))
+        self.addCleanup(shutil.rmtree, self.site, ignore_errors=True)
+        category = self.site / "notes"
+        category.mkdir()
+        (category / "2026-01-01-first.md").write_text("# 第一篇\n\n正文\n", encoding='utf-8')
+        (category / "2026-01-02-second.md").write_text("# 第二篇\n\n正文\n", encoding='utf-8')
+
+    def test_force_removes_pages_of_deleted_sources(self):
+        run_convert(self.site)
+        page = self.site / "output" / "notes" / "2026-01-01-first.html"
+        self.assertTrue(page.exists())
+
+        (self.site / "notes" / "2026-01-01-first.md").unlink()
+        run_convert(self.site, '--force')
+        self.assertFalse(page.exists())
+        self.assertTrue((self.site / "output" / "notes" / "2026-01-02-second.html").exists())
+
+
+class LineEndingTest(unittest.TestCase):
+    SOURCE = "## 代码\n\n```python\nx = 1\n```\n\n代码块之后的 **段落**\n"
+
+    def test_crlf_closes_fenced_code(self):
+        crlf = convert.convert_markdown_to_html_tokens(self.SOURCE.replace('\n', '\r\n'))
+        self.assertEqual(crlf, convert.convert_markdown_to_html_tokens(self.SOURCE))
+        self.assertIn("<strong>段落</strong>", crlf)
+        self.assertNotIn('\r', crlf)
+
+
+if __name__ == '__main__':
+    unittest.main()